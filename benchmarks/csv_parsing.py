@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Compare CSV parser backends on synthetic 33-column Ahrefs exports.
+
+Times each available file_handler backend reading every column and reading
+only the columns load_client_files keeps, against the old plain
+pd.read_csv baseline.
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+sys.path.insert(0, SRC_DIR)
+
+import file_handler  # noqa: E402
+
+logging.disable(logging.INFO)
+
+SAMPLE_FILE = os.path.join(os.path.dirname(SRC_DIR), 'filesamples',
+                           'thatch.ai-backlinks-subdomains_2025-02-02_17-56-09.csv')
+USECOLS = ['Referring page URL', 'Domain rating', 'Target URL', 'Redirect Chain URLs']
+DEFAULT_ROWS = [75000, 1000000]
+CHUNK_ROWS = 50000
+
+
+def write_ahrefs_file(path, rows, seed=0):
+    """Write a synthetic export with the sample file's 33 columns, in chunks"""
+    columns = file_handler.read_csv_header(SAMPLE_FILE)
+    rng = np.random.default_rng(seed)
+    written = 0
+    while written < rows:
+        n = min(CHUNK_ROWS, rows - written)
+        ids = np.arange(written, written + n).astype(str)
+        domains = np.char.add('site', rng.integers(0, 50000, n).astype(str))
+        pages = np.char.add(np.char.add('https://', domains), '.com/news/story-')
+        chunk = {}
+        for column in columns:
+            if column in ('Domain rating', 'UR'):
+                chunk[column] = rng.integers(0, 100, n)
+            elif column in ('Domain traffic', 'Page traffic', 'Keywords', 'Referring domains',
+                            'Linked domains', 'External links', 'Referring page HTTP code'):
+                chunk[column] = rng.integers(0, 100000, n)
+            elif column == 'Referring page URL':
+                chunk[column] = np.char.add(pages, ids)
+            elif column == 'Target URL':
+                chunk[column] = np.char.add('https://client.com/page-', (rng.integers(0, 500, n)).astype(str))
+            elif column in ('First seen', 'Last seen'):
+                chunk[column] = '2024-11-15 00:04:53'
+            elif column in ('Left context', 'Right context', 'Referring page title'):
+                chunk[column] = np.char.add('Some surrounding text, with a comma ', ids)
+            else:
+                chunk[column] = np.where(rng.random(n) < 0.5, 'true', '')
+        pd.DataFrame(chunk, columns=columns).to_csv(path, mode='w' if written == 0 else 'a',
+                                                    header=written == 0, index=False)
+        written += n
+
+
+def best_time(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CSV parser backends")
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--repeat', type=int, default=3, help="Best of this many reads")
+    parser.add_argument('--data-dir', default=tempfile.gettempdir(), help="Where generated files are kept")
+    args = parser.parse_args()
+
+    backends = ['pandas', 'stream'] + (['pyarrow'] if file_handler.PYARROW_AVAILABLE else [])
+    if not file_handler.PYARROW_AVAILABLE:
+        print("pyarrow is not installed, skipping the pyarrow backend")
+
+    for rows in args.rows:
+        path = os.path.join(args.data_dir, f'ahrefs_benchmark_{rows}.csv')
+        if not os.path.exists(path):
+            print(f"Generating {path}...")
+            write_ahrefs_file(path, rows)
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"\n{rows:,} rows x 33 columns ({size_mb:,.0f} MB), auto selects "
+              f"{file_handler.select_csv_backend(path)}")
+
+        baseline = best_time(lambda: pd.read_csv(path), args.repeat)
+        print(f"  {'baseline pd.read_csv, all columns':40s} {baseline:7.2f}s")
+        for backend in backends:
+            for label, usecols in (('all columns', None), ('load_client_files columns', USECOLS)):
+                elapsed = best_time(lambda: file_handler.read_csv(path, usecols=usecols, backend=backend),
+                                    args.repeat)
+                print(f"  {backend + ', ' + label:40s} {elapsed:7.2f}s  {baseline / elapsed:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
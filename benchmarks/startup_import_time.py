@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Measure GUI cold-start import time with `python -X importtime`.
+
+Exits non-zero when importing gui.py takes longer than the budget, so it can
+guard against heavy modules creeping back into the startup path.
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+DEFAULT_BUDGET = 1.0  # Seconds
+HEAVY_MODULES = ['pandas', 'numpy', 'matplotlib', 'tqdm']
+
+
+def measure_imports(module='gui'):
+    """Import a module in a fresh interpreter and return {module: (self us, cumulative us)}"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GUI startup import time")
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help="Maximum seconds to import gui")
+    parser.add_argument('--runs', type=int, default=3, help="Best of this many fresh interpreters")
+    parser.add_argument('--top', type=int, default=15, help="Number of slowest imports to list")
+    args = parser.parse_args()
+
+    runs = [measure_imports() for _ in range(args.runs)]
+    timings = min(runs, key=lambda t: t['gui'][1])
+    total = timings['gui'][1] / 1e6
+
+    print(f"import gui: {total:.3f}s (best of {args.runs})")
+    print(f"\nSlowest imports by cumulative time:")
+    slowest = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)[:args.top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"  {cumulative_us / 1e3:9.1f} ms  {name}")
+
+    eager = [name for name in HEAVY_MODULES if name in timings]
+    if eager:
+        print(f"\nHeavy modules imported at startup: {', '.join(eager)}")
+
+    if total > args.budget:
+        print(f"\nFAIL: startup imports exceed the {args.budget:.2f}s budget")
+        sys.exit(1)
+    print(f"\nOK: within the {args.budget:.2f}s budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ACQUISITION_FILE = 'acquisition.json'
+# Ahrefs columns the curves are built from
+DATE_COLUMNS = ['First seen', 'Last seen', 'Lost', 'Lost status']
+FREQUENCIES = ['monthly', 'weekly']
+CURVES = ['stacker_acquired', 'non_stacker_acquired', 'stacker_lost', 'non_stacker_lost']
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """Vectorized timestamp parsing to naive UTC, NaT for blanks and unparseable values"""
+    return pd.to_datetime(values, errors='coerce', utc=True).dt.tz_localize(None)
+
+
+def link_dates(df: pd.DataFrame):
+    """When each link was first seen and lost
+
+    A link's loss date is its Lost timestamp, or its Last seen timestamp
+    when Ahrefs gives a lost status without a Lost date.
+    """
+    first_seen = parse_dates(df['First seen'])
+    if 'Lost' in df.columns:
+        lost = parse_dates(df['Lost'])
+    else:
+        lost = pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]')
+    if 'Lost status' in df.columns and 'Last seen' in df.columns:
+        has_status = df['Lost status'].fillna('').astype(str).str.len() > 0
+        lost = lost.where(lost.notna() | ~has_status, parse_dates(df['Last seen']))
+    return first_seen, lost
+
+
+def period_ordinals(dates: pd.Series, freq):
+    """Month or Monday-based week number of each timestamp since 1970, and a valid mask"""
+    days = dates.to_numpy(dtype='datetime64[D]')
+    valid = ~np.isnat(days)
+    if freq == 'monthly':
+        ordinals = days.astype('datetime64[M]').astype(np.int64)
+    else:
+        # 1970-01-01 was a Thursday, so weeks start on Monday three days earlier
+        ordinals = (days.astype(np.int64) + 3) // 7
+    return ordinals, valid
+
+
+def period_label(ordinal, freq):
+    if freq == 'monthly':
+        return str(np.datetime64(int(ordinal), 'M'))
+    return str(np.datetime64(int(ordinal) * 7 - 3, 'D'))
+
+
+def period_counts(first_seen: pd.Series, lost: pd.Series, is_stacker, freq) -> pd.DataFrame:
+    """Links acquired and lost per period, split by Stacker flag, indexed by period ordinal"""
+    is_stacker = np.asarray(is_stacker, dtype=bool)
+    counts = {}
+    for kind, dates in (('acquired', first_seen), ('lost', lost)):
+        ordinals, valid = period_ordinals(dates, freq)
+        for group, mask in (('stacker', is_stacker), ('non_stacker', ~is_stacker)):
+            periods, totals = np.unique(ordinals[valid & mask], return_counts=True)
+            counts[f'{group}_{kind}'] = pd.Series(totals, index=periods)
+    return pd.DataFrame(counts, columns=CURVES).fillna(0).astype(np.int64)
+
+
+def curves_from_counts(counts: pd.DataFrame, freq) -> dict:
+    """Gap-free curves with one entry per period from the first to the last"""
+    if counts.empty:
+        return {'periods': [], **{curve: [] for curve in CURVES}}
+    ordinals = np.arange(counts.index.min(), counts.index.max() + 1)
+    counts = counts.reindex(ordinals, fill_value=0)
+    curves = {'periods': [period_label(ordinal, freq) for ordinal in ordinals]}
+    for curve in CURVES:
+        curves[curve] = counts[curve].astype(int).tolist()
+    return curves
+
+
+def acquisition_curves(df: pd.DataFrame, is_stacker) -> dict:
+    """Monthly and weekly acquisition and loss curves, None if the export has no First seen dates"""
+    if 'First seen' not in df.columns:
+        return None
+    first_seen, lost = link_dates(df)
+    return {freq: curves_from_counts(period_counts(first_seen, lost, is_stacker, freq), freq)
+            for freq in FREQUENCIES}
+
+
+def save_acquisition(curves, report_path):
+    with open(os.path.join(report_path, ACQUISITION_FILE), 'w') as f:
+        json.dump(curves, f)
+
+
+def load_acquisition(report_path):
+    """Load a report's curves, None for reports saved without them"""
+    path = os.path.join(report_path, ACQUISITION_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
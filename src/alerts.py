@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import math
+import logging
+import argparse
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from file_handler import list_report_dirs, read_report_summary
+from main import DR_BINS
+from utils import get_project_root, get_client_directory
+
+logger = logging.getLogger(__name__)
+
+ALERT_CONFIG_FILE = 'alert_config.json'
+ALERT_STATE_FILE = '.alert_state.json'
+ALERTS_FILE = 'alerts.jsonl'  # Per client, and for every client in the clients directory
+DEFAULT_LIMIT = 200
+TAIL_BLOCK_BYTES = 64 * 1024
+HIGH_VALUE_DR = 70  # Stacker links at or above this DR count as high-value
+
+# Defaults, overridden by alert_config.json in the project root
+DEFAULT_CONFIG = {
+    'alpha': 0.3,  # EWMA smoothing, higher follows recent reports more closely
+    'z_threshold': 3.0,  # Deviations from the EWMA mean, in EWMA standard deviations
+    'min_change': 0.1,  # and relative to the EWMA mean, that raise an alert
+    'min_reports': 3,  # Reports seen before a metric can alert
+    # Metrics watched and the direction of change that alerts; rules can set their own thresholds
+    'rules': {
+        'Total Links': {'direction': 'down', 'alert': 'Sudden link loss'},
+        'Stacker Links': {'direction': 'down', 'alert': 'Sudden Stacker link loss'},
+        'Average Stacker DR': {'direction': 'both', 'alert': 'Stacker DR change'},
+        'Average Non-Stacker DR': {'direction': 'both', 'alert': 'Non-Stacker DR change'},
+        'Stacker Link Weight Gain': {'direction': 'both', 'alert': 'Stacker link weight change'},
+        'High-DR Stacker Links': {'direction': 'up', 'alert': 'New high-value links'}
+    }
+}
+
+ALERT_COLUMNS = ['Time', 'Client', 'Report', 'Alert', 'Metric', 'Value', 'Expected', 'Z']
+
+
+def load_alert_config(path=None):
+    """Load the default alert thresholds plus any from the project alert config file"""
+    if path is None:
+        path = os.path.join(get_project_root(), ALERT_CONFIG_FILE)
+    config = dict(DEFAULT_CONFIG, rules=dict(DEFAULT_CONFIG['rules']))
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                overrides = json.load(f)
+            config['rules'].update(overrides.pop('rules', {}))
+            config.update(overrides)
+        except Exception as e:
+            logger.error(f"Error loading alert config from {path}: {str(e)}")
+    return config
+
+
+def report_values(summary: dict) -> dict:
+    """Values of the watched metrics from a report summary"""
+    values = dict(summary)
+    histogram = summary.get('Stacker DR Histogram')
+    if histogram is not None:
+        values['High-DR Stacker Links'] = sum(histogram[np.searchsorted(DR_BINS, HIGH_VALUE_DR):])
+    return values
+
+
+class RollingStat:
+    """Exponentially weighted mean and variance of one metric, updated in O(1)"""
+
+    def __init__(self, mean=0.0, var=0.0, count=0):
+        self.mean = mean
+        self.var = var
+        self.count = count
+
+    def deviation(self, value):
+        """(change from the mean, z-score) of a value before it is added"""
+        change = value - self.mean
+        std = math.sqrt(self.var)
+        if std == 0:
+            return change, 0.0 if change == 0 else math.copysign(math.inf, change)
+        return change, change / std
+
+    def update(self, value, alpha):
+        if self.count == 0:
+            self.mean, self.var = value, 0.0
+        else:
+            change = value - self.mean
+            increment = alpha * change
+            self.mean += increment
+            self.var = (1 - alpha) * (self.var + change * increment)
+        self.count += 1
+
+    def to_dict(self):
+        return {'mean': self.mean, 'var': self.var, 'count': self.count}
+
+
+class ClientAlerts:
+    """Rolling report statistics and alert log of one client"""
+
+    def __init__(self, client_path, config=None):
+        self.client = os.path.basename(os.path.normpath(client_path))
+        self.client_path = client_path
+        self.config = config or load_alert_config()
+        self.state_path = os.path.join(client_path, ALERT_STATE_FILE)
+        self.report = None
+        self.stats = {}
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path) as f:
+                    state = json.load(f)
+                self.report = state['report']
+                self.stats = {metric: RollingStat(**stat) for metric, stat in state['stats'].items()}
+            except Exception as e:
+                logger.error(f"Error reading alert state for {self.client}: {str(e)}")
+
+    def check(self, metric, value, stat):
+        """Alert record if a value deviates from its metric's rolling statistics"""
+        rule = self.config['rules'][metric]
+        if stat.count < rule.get('min_reports', self.config['min_reports']):
+            return None
+        change, z = stat.deviation(value)
+        direction = rule.get('direction', 'both')
+        if direction == 'down' and change >= 0 or direction == 'up' and change <= 0:
+            return None
+        if abs(z) < rule.get('z_threshold', self.config['z_threshold']):
+            return None
+        if abs(change) < rule.get('min_change', self.config['min_change']) * abs(stat.mean):
+            return None
+        return {
+            'Alert': rule['alert'],
+            'Metric': metric,
+            'Value': value,
+            'Expected': round(stat.mean, 2),
+            'Z': round(z, 2) if math.isfinite(z) else None
+        }
+
+    def update(self, report, summary):
+        """Add one report to the rolling statistics, returning the alerts it raises"""
+        if self.report is not None and report <= self.report:
+            return []
+        values = report_values(summary)
+        time = datetime.now().isoformat(timespec='seconds')
+        alerts = []
+        for metric in self.config['rules']:
+            value = values.get(metric)
+            if value is None or isinstance(value, float) and math.isnan(value):
+                continue
+            stat = self.stats.setdefault(metric, RollingStat())
+            alert = self.check(metric, value, stat)
+            if alert:
+                alerts.append({'Time': time, 'Client': self.client, 'Report': report, **alert})
+            stat.update(value, self.config['alpha'])
+        self.report = report
+        return alerts
+
+    def save(self):
+        state = {'report': self.report, 'stats': {metric: stat.to_dict() for metric, stat in self.stats.items()}}
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+
+def append_alerts(path, alerts):
+    """Append alerts to a log in a single write, so concurrent runs do not interleave lines"""
+    if alerts:
+        with open(path, 'a') as f:
+            f.write(''.join(json.dumps(alert) + '\n' for alert in alerts))
+
+
+def update_client_alerts(client_path, report_path, config=None):
+    """Update a client's rolling statistics with a new report and log any alerts it raises"""
+    alerts_state = ClientAlerts(client_path, config)
+    alerts = alerts_state.update(os.path.basename(report_path), read_report_summary(report_path))
+    alerts_state.save()
+
+    append_alerts(os.path.join(client_path, ALERTS_FILE), alerts)
+    append_alerts(os.path.join(os.path.dirname(os.path.normpath(client_path)), ALERTS_FILE), alerts)
+    for alert in alerts:
+        logger.warning(f"{alert['Client']}: {alert['Alert']} - {alert['Metric']} is {alert['Value']}, "
+                       f"expected about {alert['Expected']}")
+    return alerts
+
+
+def rebuild_client_alerts(client_path, config=None):
+    """Replay every saved report into fresh rolling statistics, returning all alerts raised"""
+    alerts_state = ClientAlerts(client_path, config)
+    alerts_state.report, alerts_state.stats = None, {}
+    alerts = []
+    for report in list_report_dirs(client_path):
+        alerts += alerts_state.update(report, read_report_summary(os.path.join(client_path, 'reports', report)))
+    alerts_state.save()
+
+    log_path = os.path.join(client_path, ALERTS_FILE)
+    if os.path.exists(log_path):
+        os.remove(log_path)
+    append_alerts(log_path, alerts)
+    return alerts
+
+
+def read_alerts(path, limit=DEFAULT_LIMIT):
+    """Most recent alerts in a log, newest first, reading only the end of the file"""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        data = b''
+        # Read whole blocks backwards until the last limit lines are complete
+        while end > 0 and data.count(b'\n') <= limit:
+            start = max(0, end - TAIL_BLOCK_BYTES)
+            f.seek(start)
+            data = f.read(end - start) + data
+            end = start
+    lines = [line for line in data.splitlines() if line.strip()][-limit:]
+    return [json.loads(line) for line in reversed(lines)]
+
+
+def load_alerts(client=None, client_dir=None, limit=DEFAULT_LIMIT):
+    """Recent alerts of one client, or of every client, as a table"""
+    client_dir = client_dir or get_client_directory()
+    path = os.path.join(client_dir, client, ALERTS_FILE) if client else os.path.join(client_dir, ALERTS_FILE)
+    return pd.DataFrame(read_alerts(path, limit), columns=ALERT_COLUMNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show report alerts for one client or every client")
+    parser.add_argument('client', nargs='?', help="Client name (defaults to the log for every client)")
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT, help="Most recent alerts to show")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="Recompute the client's rolling statistics and alert log from its saved reports")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        if not args.client:
+            parser.error("--rebuild needs a client")
+        alerts = rebuild_client_alerts(os.path.join(get_client_directory(), args.client))
+        print(f"Replayed reports for {args.client}, {len(alerts)} alerts")
+
+    alerts = load_alerts(args.client, limit=args.limit)
+    if alerts.empty:
+        print("No alerts")
+    else:
+        print(alerts.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import logging
+import argparse
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+import pandas as pd
+from main import PickupIndex, match_urls
+from url_templates import TEMPLATE_LIBRARY_FILE, get_template_matcher
+from partner_index import PARTNER_INDEX_FILE, PartnerIndex, get_partner_domains
+from file_handler import (
+    read_csv,
+    file_signature,
+    find_pickup_file,
+    list_report_dirs,
+    get_latest_report_dir,
+    parse_metric_value,
+    read_report_metrics
+)
+from utils import get_client_directory, get_project_root
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_SIZE = 32
+
+
+def diff_reports(report_a, report_b):
+    """Compare two reports: metric deltas plus gained and lost Stacker links"""
+    metrics_a = read_report_metrics(report_a)
+    metrics_b = read_report_metrics(report_b)
+    metric_deltas = {}
+    for name in metrics_a.keys() & metrics_b.keys():
+        value_a = parse_metric_value(metrics_a[name])
+        value_b = parse_metric_value(metrics_b[name])
+        if value_a is not None and value_b is not None:
+            metric_deltas[name] = {'a': value_a, 'b': value_b, 'delta': value_b - value_a}
+
+    columns = ['Referring page URL', 'is_stacker_link']
+    links_a = pd.read_csv(os.path.join(report_a, 'backlinks_analysis.csv'), usecols=columns)
+    links_b = pd.read_csv(os.path.join(report_b, 'backlinks_analysis.csv'), usecols=columns)
+    stacker_a = set(links_a.loc[links_a['is_stacker_link'], 'Referring page URL'])
+    stacker_b = set(links_b.loc[links_b['is_stacker_link'], 'Referring page URL'])
+
+    return {
+        'report_a': os.path.basename(report_a),
+        'report_b': os.path.basename(report_b),
+        'metrics': metric_deltas,
+        'gained_stacker_links': sorted(stacker_b - stacker_a),
+        'lost_stacker_links': sorted(stacker_a - stacker_b)
+    }
+
+
+class ClientState:
+    """Warm per-client data: matcher setup and latest report summary
+
+    Holds everything pipeline.analyze_client matches with, so the API
+    agrees with the reports: the pickup index, the URL template matcher
+    with the pickups' template keys, and the partner domains.
+    """
+
+    def __init__(self, client_path):
+        self.client_path = client_path
+        self.pickup_signature = None
+        self.pickup_df = None
+        self.pickup_index = None
+        self.template_signature = None
+        self.template_matcher = None
+        self.template_keys = None
+        self.partner_signature = None
+        self.partner_domains = None
+        self.report_path = None
+        self.report_metrics = {}
+        # Held while reloading, so only requests for this client wait on a cold load
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        """Reload only the parts whose files changed since the last request"""
+        signature = file_signature(find_pickup_file(self.client_path))
+        if signature is None:
+            raise FileNotFoundError("No pickup export found")
+        pickup_changed = signature != self.pickup_signature
+        if pickup_changed:
+            logger.info(f"Indexing pickup export for {os.path.basename(self.client_path)}")
+            self.pickup_df = read_csv(signature[0])
+            self.pickup_index = PickupIndex(self.pickup_df)
+            self.pickup_signature = signature
+
+        template_signature = file_signature(os.path.join(get_project_root(), TEMPLATE_LIBRARY_FILE))
+        if template_signature != self.template_signature or self.template_matcher is None:
+            self.template_matcher = get_template_matcher()
+            self.template_signature = template_signature
+            self.template_keys = None
+        if self.template_keys is None or pickup_changed:
+            self.template_keys = self.template_matcher.index_pickups(self.pickup_df['URL'])
+
+        # Partner domains span every client, so they also reload when another client updates the index
+        client_dir = os.path.dirname(os.path.normpath(self.client_path))
+        partner_path = os.path.join(client_dir, PARTNER_INDEX_FILE)
+        if pickup_changed or self.partner_domains is None:
+            self.partner_domains = get_partner_domains(os.path.basename(self.client_path), client_dir)
+            self.partner_signature = file_signature(partner_path)
+        elif file_signature(partner_path) != self.partner_signature:
+            self.partner_domains = PartnerIndex.load(client_dir).domains
+            self.partner_signature = file_signature(partner_path)
+
+        report_path = get_latest_report_dir(self.client_path)
+        if report_path != self.report_path:
+            self.report_path = report_path
+            self.report_metrics = read_report_metrics(report_path) if report_path else {}
+
+
+class ClientCache:
+    """LRU cache of ClientState objects, evicting the least recently used client"""
+
+    def __init__(self, max_clients=DEFAULT_CACHE_SIZE, client_dir=None):
+        self.max_clients = max_clients
+        self.client_dir = client_dir or get_client_directory()
+        self.clients = OrderedDict()
+        self.diffs = OrderedDict()
+        self.lock = threading.Lock()
+
+    def client_path(self, client):
+        path = os.path.join(self.client_dir, client)
+        if client.startswith('.') or os.sep in client or not os.path.isdir(path):
+            raise KeyError(client)
+        return path
+
+    def get(self, client):
+        """Get a fresh ClientState, loading it on first use
+
+        The cache-wide lock only covers the LRU bookkeeping. Loading runs
+        under the client's own lock, so a cold client never blocks requests
+        for other clients.
+        """
+        with self.lock:
+            state = self.clients.pop(client, None)
+            if state is None:
+                state = ClientState(self.client_path(client))
+            self.clients[client] = state
+            while len(self.clients) > self.max_clients:
+                evicted, _ = self.clients.popitem(last=False)
+                logger.info(f"Evicted {evicted} from client cache")
+
+        with state.lock:
+            state.refresh()
+        return state
+
+    def diff(self, client, report_a, report_b):
+        """Diff two reports, caching results since reports never change once written"""
+        key = (client, report_a, report_b)
+        with self.lock:
+            if key in self.diffs:
+                self.diffs.move_to_end(key)
+                return self.diffs[key]
+
+        client_path = self.client_path(client)
+        reports = list_report_dirs(client_path)
+        for report in (report_a, report_b):
+            if report not in reports:
+                raise KeyError(report)
+        result = diff_reports(
+            os.path.join(client_path, 'reports', report_a),
+            os.path.join(client_path, 'reports', report_b)
+        )
+
+        with self.lock:
+            self.diffs[key] = result
+            while len(self.diffs) > self.max_clients:
+                self.diffs.popitem(last=False)
+        return result
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints:
+
+    GET  /clients
+    GET  /clients/<client>/metrics
+    GET  /clients/<client>/reports
+    GET  /clients/<client>/diff?a=<report>&b=<report>
+    POST /clients/<client>/match   {"urls": [...], "redirect_chains": [...]}
+
+    Matching uses the same pickup index, URL templates, redirect hops and
+    partner domain filter as pipeline.analyze_client.
+    """
+
+    cache = None
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        parts = [unquote(p) for p in url.path.strip('/').split('/') if p]
+        try:
+            if method == 'GET' and parts == ['clients']:
+                return self._send(200, {'clients': self._list_clients()})
+            if len(parts) == 3 and parts[0] == 'clients':
+                client, action = parts[1], parts[2]
+                if method == 'GET' and action == 'metrics':
+                    return self._send(200, self._metrics(client))
+                if method == 'GET' and action == 'reports':
+                    return self._send(200, {'reports': list_report_dirs(self.cache.client_path(client))})
+                if method == 'GET' and action == 'diff':
+                    query = parse_qs(url.query)
+                    report_a, report_b = self._diff_reports(client, query)
+                    return self._send(200, self.cache.diff(client, report_a, report_b))
+                if method == 'POST' and action == 'match':
+                    return self._send(200, self._match(client))
+            self._send(404, {'error': 'Unknown endpoint'})
+        except KeyError as e:
+            self._send(404, {'error': f"Not found: {e.args[0]}"})
+        except (ValueError, FileNotFoundError) as e:
+            self._send(400, {'error': str(e)})
+        except Exception as e:
+            logger.error(f"Error handling {method} {self.path}: {str(e)}")
+            self._send(500, {'error': str(e)})
+
+    def _list_clients(self):
+        client_dir = self.cache.client_dir
+        return sorted(d for d in os.listdir(client_dir)
+                      if os.path.isdir(os.path.join(client_dir, d)) and not d.startswith('.'))
+
+    def _metrics(self, client):
+        state = self.cache.get(client)
+        return {
+            'client': client,
+            'report': os.path.basename(state.report_path) if state.report_path else None,
+            'metrics': state.report_metrics
+        }
+
+    def _diff_reports(self, client, query):
+        reports = list_report_dirs(self.cache.client_path(client))
+        report_b = query.get('b', [reports[-1] if reports else None])[0]
+        report_a = query.get('a', [reports[-2] if len(reports) > 1 else None])[0]
+        if report_a is None or report_b is None:
+            raise ValueError("Two reports are needed for a diff")
+        return report_a, report_b
+
+    def _match(self, client):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        urls = body.get('urls')
+        if not isinstance(urls, list):
+            raise ValueError("Request body needs a 'urls' list")
+
+        chains = body.get('redirect_chains')
+        if chains is not None and (not isinstance(chains, list) or len(chains) != len(urls)):
+            raise ValueError("'redirect_chains' must be a list as long as 'urls'")
+
+        state = self.cache.get(client)
+        backlinks = pd.DataFrame({'Referring page URL': pd.Series(urls, dtype=object), 'Domain rating': float('nan')})
+        if chains is not None:
+            backlinks['Redirect Chain URLs'] = pd.Series(chains, dtype=object)
+        # refresh() replaces rather than mutates these, so a consistent snapshot is enough
+        with state.lock:
+            pickup_df, pickup_index = state.pickup_df, state.pickup_index
+            template_matcher, template_keys = state.template_matcher, state.template_keys
+            partner_domains = state.partner_domains
+        matched = match_urls(
+            backlinks,
+            pickup_df,
+            template_matcher,
+            pickup_index=pickup_index,
+            partner_domains=partner_domains,
+            template_keys=template_keys
+        )
+        return {
+            'client': client,
+            'matches': [
+                {'url': url, 'is_stacker_link': bool(stacker), 'matched_story': story, 'matched_via': via}
+                for url, stacker, story, via in zip(urls, matched['is_stacker_link'],
+                                                    matched['matched_story'], matched['matched_via'])
+            ]
+        }
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} - {format % args}")
+
+
+def create_server(host=DEFAULT_HOST, port=DEFAULT_PORT, max_clients=DEFAULT_CACHE_SIZE, client_dir=None):
+    """Create the analysis API server with its own client cache"""
+    handler = type('Handler', (AnalysisRequestHandler,), {
+        'cache': ClientCache(max_clients, client_dir)
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local analysis API for Big Backlink")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE,
+                        help="Number of clients kept warm in memory")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.cache_size)
+    logger.info(f"Serving analysis API on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
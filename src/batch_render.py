@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import matplotlib
+matplotlib.use('Agg')  # Headless, workers never touch Tk
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from file_handler import get_latest_report_dir, read_report_summary
+from acquisition import load_acquisition
+from rollups import load_rollups, rollup
+from visualization import (
+    create_distribution_axes,
+    draw_distribution_charts,
+    create_acquisition_axes,
+    draw_acquisition_chart,
+    draw_rollup_chart
+)
+from utils import get_client_directory, get_project_root
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = os.cpu_count() or 2
+DEFAULT_DPI = 100
+PAGE_SIZE = (12, 8)
+FORMATS = ['pdf', 'png']
+
+_template = None  # One per worker process
+
+
+class ReportTemplate:
+    """Figures and axes laid out once and redrawn for each client
+
+    Building figures and grid layouts costs more than drawing the few
+    artists of a chart from summary values, so a worker clears and reuses
+    the same pages for every client it renders.
+    """
+
+    def __init__(self, figsize=PAGE_SIZE):
+        # Fixed margins instead of constrained layout, which would be re-solved on every save
+        self.distribution = self._figure(figsize, left=0.06, right=0.97, bottom=0.08, top=0.88)
+        self.distribution_axes = create_distribution_axes(self.distribution)
+        self.acquisition = self._figure(figsize, left=0.08, right=0.97, bottom=0.12, top=0.88, hspace=0.25)
+        self.acquisition_axes = create_acquisition_axes(self.acquisition)
+        # Wide left margins leave room for story and partner names
+        self.rollups = self._figure(figsize, left=0.22, right=0.98, bottom=0.08, top=0.88, wspace=0.75)
+        self.rollup_axes = [self.rollups.add_subplot(1, 2, 1), self.rollups.add_subplot(1, 2, 2)]
+
+    @staticmethod
+    def _figure(figsize, **margins):
+        fig = Figure(figsize=figsize)
+        fig.subplots_adjust(**margins)
+        FigureCanvasAgg(fig)
+        return fig
+
+    @staticmethod
+    def _reset(fig, axes, title):
+        for ax in axes:
+            ax.clear()
+        fig.suptitle(title, weight='bold', size=14)
+
+    def pages(self, client, report_path):
+        """Yield (page name, figure) for each page of a client's report"""
+        report = os.path.basename(report_path)
+        summary = read_report_summary(report_path)
+
+        self._reset(self.distribution, self.distribution_axes, f"{client} - {report}")
+        draw_distribution_charts(self.distribution_axes, summary)
+        yield 'distribution', self.distribution
+
+        curves = load_acquisition(report_path)
+        if curves is not None and curves['monthly']['periods']:
+            self._reset(self.acquisition, self.acquisition_axes, f"{client} - {report}")
+            draw_acquisition_chart(self.acquisition_axes, curves['monthly'], 'Monthly Link Acquisition and Loss')
+            yield 'acquisition', self.acquisition
+
+        base = load_rollups(report_path)
+        if base is not None and len(base):
+            self._reset(self.rollups, self.rollup_axes, f"{client} - {report}")
+            draw_rollup_chart(self.rollup_axes[0], rollup(base, 'Story'), 'Story Name', 'Top Stories')
+            draw_rollup_chart(self.rollup_axes[1], rollup(base, 'Partner'), 'Partner', 'Top Partners')
+            yield 'rollups', self.rollups
+
+
+def render_client(client, report_path, output_dir, fmt='pdf', dpi=DEFAULT_DPI):
+    """Worker entry point: render one client's latest report, returning the output path"""
+    global _template
+    if _template is None:
+        _template = ReportTemplate()
+
+    if fmt == 'pdf':
+        output_path = os.path.join(output_dir, f"{client}.pdf")
+        tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        with PdfPages(tmp_path) as pdf:
+            for _, fig in _template.pages(client, report_path):
+                pdf.savefig(fig)
+        os.replace(tmp_path, output_path)
+        return output_path
+
+    output_path = os.path.join(output_dir, client)
+    os.makedirs(output_path, exist_ok=True)
+    for number, (name, fig) in enumerate(_template.pages(client, report_path), 1):
+        fig.savefig(os.path.join(output_path, f"{number:02d}_{name}.png"), dpi=dpi)
+    return output_path
+
+
+def render_clients(clients=None, output_dir=None, fmt='pdf', workers=DEFAULT_WORKERS,
+                   dpi=DEFAULT_DPI, client_dir=None):
+    """Render the latest report of each client in a process pool, returning {client: output}"""
+    client_dir = client_dir or get_client_directory()
+    output_dir = output_dir or os.path.join(get_project_root(), 'rendered')
+    os.makedirs(output_dir, exist_ok=True)
+    if clients is None:
+        clients = sorted(d for d in os.listdir(client_dir)
+                         if os.path.isdir(os.path.join(client_dir, d)) and not d.startswith('.'))
+
+    jobs = {}
+    for client in clients:
+        report_path = get_latest_report_dir(os.path.join(client_dir, client))
+        if report_path is None:
+            logger.warning(f"No reports for {client}, skipping")
+            continue
+        jobs[client] = report_path
+
+    start = time.perf_counter()
+    outputs = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(render_client, client, report_path, output_dir, fmt, dpi): client
+            for client, report_path in jobs.items()
+        }
+        for future in as_completed(futures):
+            client = futures[future]
+            try:
+                outputs[client] = future.result()
+            except Exception as e:
+                logger.error(f"Error rendering {client}: {str(e)}")
+
+    logger.info(f"Rendered {len(outputs)} of {len(jobs)} clients to {output_dir} "
+                f"in {time.perf_counter() - start:.1f}s")
+    return outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render client report charts headlessly")
+    parser.add_argument('clients', nargs='*', help="Client names (defaults to every client)")
+    parser.add_argument('--output', help="Output directory (defaults to rendered/ in the project root)")
+    parser.add_argument('--format', choices=FORMATS, default='pdf',
+                        help="One multi-page PDF per client, or a directory of PNG pages")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI, help="PNG resolution")
+    args = parser.parse_args()
+
+    render_clients(args.clients or None, args.output, args.format, args.workers, args.dpi)
+
+
+if __name__ == "__main__":
+    main()
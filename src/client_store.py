@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import sqlite3
+import logging
+import argparse
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from main import URLProcessor, PickupIndex, PATH_LENGTH, REDIRECT_CHAIN_SEPARATOR, DR_BINS, format_metrics
+from file_handler import file_signature, find_ahrefs_file, find_pickup_file, read_csv
+from acquisition import DATE_COLUMNS, FREQUENCIES, link_dates, period_counts, curves_from_counts
+from utils import get_client_directory
+
+logger = logging.getLogger(__name__)
+
+STORE_FILE = '.client_store.sqlite'
+STORE_VERSION = 2  # Bumped when the schema changes, so existing stores are reloaded
+CHUNK_SIZE = 100000  # Backlink rows read, inserted or exported at a time
+CACHE_SIZE_KB = 64 * 1024  # SQLite page cache, bounds memory use of large joins
+BACKLINK_COLUMNS = {
+    'Referring page URL': 'referring_url',
+    'Target URL': 'target_url',
+    'Domain rating': 'domain_rating',
+    'Redirect Chain URLs': 'redirect_chain'
+}
+# Upper bound for strings starting with a prefix, used for index range scans
+PREFIX_END = "char(1114111)"
+
+BACKLINKS_TABLE = """
+CREATE TABLE IF NOT EXISTS backlinks (
+    id INTEGER PRIMARY KEY,
+    referring_url TEXT,
+    target_url TEXT,
+    domain_rating NUMERIC,
+    domain TEXT,
+    path TEXT,
+    first_seen TEXT,
+    lost_at TEXT
+);
+"""
+
+SCHEMA = BACKLINKS_TABLE + """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS hops (
+    backlink_id INTEGER,
+    hop INTEGER,
+    domain TEXT,
+    path TEXT
+);
+CREATE TABLE IF NOT EXISTS pickups (
+    row INTEGER PRIMARY KEY,
+    url TEXT,
+    domain TEXT,
+    path_key TEXT,
+    story TEXT,
+    story_code INTEGER,
+    partner_code INTEGER,
+    publisher_code INTEGER
+);
+CREATE TABLE IF NOT EXISTS pickup_keys (
+    domain TEXT,
+    path_key TEXT,
+    priority INTEGER,
+    pickup_row INTEGER,
+    PRIMARY KEY (domain, path_key)
+);
+CREATE TABLE IF NOT EXISTS pickup_labels (
+    dimension TEXT,
+    code INTEGER,
+    label TEXT,
+    PRIMARY KEY (dimension, code)
+);
+CREATE TABLE IF NOT EXISTS matches (
+    backlink_id INTEGER PRIMARY KEY,
+    pickup_row INTEGER,
+    matched_via TEXT
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    report TEXT PRIMARY KEY,
+    created_at TEXT,
+    ahrefs_file TEXT,
+    pickup_file TEXT,
+    metrics TEXT
+);
+"""
+
+# Created after bulk loads, which is much faster than maintaining them per insert
+INDEXES = """
+CREATE INDEX IF NOT EXISTS backlinks_domain_path ON backlinks (domain, path);
+CREATE INDEX IF NOT EXISTS hops_domain_path ON hops (domain, path);
+CREATE INDEX IF NOT EXISTS hops_backlink ON hops (backlink_id, hop);
+CREATE INDEX IF NOT EXISTS pickups_domain_path ON pickups (domain, path_key);
+"""
+
+
+def _split(url):
+    """split_url that returns (None, None) for values it cannot parse"""
+    try:
+        return URLProcessor.split_url(url)
+    except Exception:
+        return None, None
+
+
+def _text(value):
+    return None if pd.isna(value) else str(value)
+
+
+class ClientStore:
+    """SQLite copy of one client's backlinks, pickups, matches and report snapshots
+
+    Backlinks are streamed in from the Ahrefs export in chunks, and matching
+    and metrics run as set-based SQL over the (domain, path) indexes, so a
+    client whose exports do not fit in memory can still be analyzed and
+    queried ad hoc. Pickup exports are small and are indexed in memory as
+    usual before being written to the store.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def for_client(cls, client, client_dir=None):
+        return cls(os.path.join(client_dir or get_client_directory(), client, STORE_FILE))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, json.dumps(value)))
+
+    def load(self, ahrefs_file, pickup_file, force=False):
+        """Load both exports unless the store already holds these exact files"""
+        signatures = [STORE_VERSION, list(file_signature(ahrefs_file)), list(file_signature(pickup_file))]
+        if not force and self.get_meta('inputs') == signatures:
+            logger.info(f"Store is up to date with {os.path.basename(ahrefs_file)}")
+            return False
+        with self.conn:
+            self.load_pickups(pickup_file)
+            self.load_backlinks(ahrefs_file)
+            self.conn.execute("DELETE FROM matches")
+            self.set_meta('inputs', signatures)
+        self.conn.executescript(INDEXES)
+        self.conn.execute("ANALYZE")
+        return True
+
+    def load_pickups(self, pickup_file):
+        """Write pickup rows, their prefix keys and dimension labels"""
+        pickup_df = read_csv(pickup_file)
+        index = PickupIndex(pickup_df)
+        split = [_split(url) for url in pickup_df['URL']]
+        self.conn.execute("DELETE FROM pickups")
+        self.conn.executemany("INSERT INTO pickups VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (
+            (row, _text(url), domain, path[:PATH_LENGTH] if path else None, _text(story),
+             int(index.codes['story'][row]), int(index.codes['partner'][row]), int(index.codes['publisher'][row]))
+            for row, (url, (domain, path), story) in enumerate(zip(pickup_df['URL'], split, index.story_titles))
+        ))
+
+        # Same key semantics as PickupIndex: a key keeps the position of its first
+        # row within the domain but points at the last row that produced it
+        self.conn.execute("DELETE FROM pickup_keys")
+        self.conn.execute("""
+            INSERT INTO pickup_keys
+            SELECT domain, path_key, MIN(row), MAX(row) FROM pickups
+            WHERE domain IS NOT NULL AND path_key <> ''
+            GROUP BY domain, path_key
+        """)
+
+        self.conn.execute("DELETE FROM pickup_labels")
+        labels = [(name, code, _text(label)) for name, values in index.labels.items()
+                  for code, label in enumerate(values)]
+        labels += [('story_name', code, _text(name)) for code, name in enumerate(index.story_names)]
+        self.conn.executemany("INSERT INTO pickup_labels VALUES (?, ?, ?)", labels)
+        logger.info(f"Stored {len(pickup_df)} pickups ({index.pickup_count} with paths)")
+
+    def load_backlinks(self, ahrefs_file, chunksize=CHUNK_SIZE):
+        """Stream the Ahrefs export into the store with cleaned domains, paths and hops"""
+        self.conn.execute("DROP INDEX IF EXISTS backlinks_domain_path")
+        self.conn.execute("DROP INDEX IF EXISTS hops_domain_path")
+        self.conn.execute("DROP INDEX IF EXISTS hops_backlink")
+        # Recreated rather than emptied so stores from older versions pick up new columns
+        self.conn.execute("DROP TABLE IF EXISTS backlinks")
+        self.conn.execute(BACKLINKS_TABLE)
+        self.conn.execute("DELETE FROM hops")
+
+        total = 0
+        columns = lambda c: c in BACKLINK_COLUMNS or c in DATE_COLUMNS
+        for chunk in pd.read_csv(ahrefs_file, usecols=columns, chunksize=chunksize):
+            if 'First seen' in chunk:
+                first_seen, lost = link_dates(chunk)
+                first_seen = first_seen.dt.strftime('%Y-%m-%d %H:%M:%S')
+                lost = lost.dt.strftime('%Y-%m-%d %H:%M:%S')
+            else:
+                first_seen = lost = pd.Series(None, index=chunk.index)
+            chunk = chunk.rename(columns=BACKLINK_COLUMNS)
+            ids = np.arange(total, total + len(chunk))
+            split = [_split(url) for url in chunk['referring_url']]
+            target = chunk['target_url'] if 'target_url' in chunk else pd.Series(None, index=chunk.index)
+            self.conn.executemany("INSERT INTO backlinks VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (
+                (int(i), _text(url), _text(target_url), None if pd.isna(dr) else float(dr), domain, path,
+                 _text(first), _text(lost_at))
+                for i, url, target_url, dr, (domain, path), first, lost_at
+                in zip(ids, chunk['referring_url'], target, chunk['domain_rating'], split, first_seen, lost)
+            ))
+
+            if 'redirect_chain' in chunk:
+                chains = pd.Series(chunk['redirect_chain'].to_numpy(), index=ids)
+                hops = chains.dropna().astype(str).str.strip().str.split(REDIRECT_CHAIN_SEPARATOR).explode()
+                hops = hops[hops.notna() & (hops.str.len() > 0)]
+                hop_numbers = hops.groupby(level=0).cumcount() + 1
+                self.conn.executemany("INSERT INTO hops VALUES (?, ?, ?, ?)", (
+                    (int(i), int(hop), *_split(url))
+                    for i, hop, url in zip(hops.index, hop_numbers, hops)
+                ))
+            total += len(chunk)
+        logger.info(f"Stored {total} backlinks")
+
+    def _prefix_matches(self, table, id_column, order, partner_filter, exclude=''):
+        """SQL selecting each row's best pickup key match by (domain, path prefix)"""
+        return f"""
+            SELECT {id_column} AS backlink_id, pickup_row{', hop' if table == 'hops' else ''} FROM (
+                SELECT t.{id_column}, k.pickup_row{', t.hop' if table == 'hops' else ''},
+                       ROW_NUMBER() OVER (PARTITION BY t.{id_column} ORDER BY {order}) AS rank
+                FROM pickup_keys k
+                JOIN {table} t ON t.domain = k.domain
+                    AND t.path >= k.path_key AND t.path < k.path_key || {PREFIX_END}
+                WHERE t.{id_column} NOT IN (SELECT backlink_id FROM matches)
+                    {partner_filter} {exclude}
+            ) WHERE rank = 1
+        """
+
+    def match(self, template_matcher=None, partner_domains=None):
+        """Match stored backlinks to pickups, mirroring main.match_urls
+
+        Backlinks whose referring page fits a URL template are joined by
+        template key first and are never prefix matched.
+        """
+        logger.info("Matching backlinks in the client store...")
+        with self.conn:
+            self.conn.execute("DELETE FROM matches")
+            self.conn.execute("DROP TABLE IF EXISTS temp.partner_domains")
+            partner_filter = ''
+            if partner_domains is not None:
+                self.conn.execute("CREATE TEMP TABLE partner_domains (domain TEXT PRIMARY KEY)")
+                self.conn.executemany("INSERT INTO partner_domains VALUES (?)", ((d,) for d in partner_domains))
+                partner_filter = "AND t.domain IN (SELECT domain FROM partner_domains)"
+
+            # Template URLs are decided by their key alone, before any prefix matching
+            self.conn.execute("DROP TABLE IF EXISTS temp.templated")
+            self.conn.execute("CREATE TEMP TABLE templated (backlink_id INTEGER PRIMARY KEY, key TEXT)")
+            templated_filter = ''
+            if template_matcher is not None:
+                def template_key(url):
+                    key = template_matcher.url_key(url) if url else None
+                    return None if key is None else '\x1f'.join(str(v) for v in key)
+
+                self.conn.create_function('template_key', 1, template_key, deterministic=True)
+                self.conn.execute(f"""
+                    INSERT INTO templated
+                    SELECT id, key FROM (SELECT t.id, template_key(t.referring_url) AS key
+                                         FROM backlinks t WHERE 1 {partner_filter})
+                    WHERE key IS NOT NULL
+                """)
+                self.conn.execute("""
+                    INSERT INTO matches
+                    SELECT t.backlink_id, p.pickup_row, 'url template'
+                    FROM templated t
+                    JOIN (
+                        SELECT key, MIN(row) AS pickup_row FROM (
+                            SELECT template_key(url) AS key, row FROM pickups
+                        ) WHERE key IS NOT NULL GROUP BY key
+                    ) p ON p.key = t.key
+                """)
+                templated_filter = "AND t.id NOT IN (SELECT backlink_id FROM temp.templated)"
+
+            self.conn.execute(f"""
+                INSERT INTO matches
+                SELECT backlink_id, pickup_row, 'referring page'
+                FROM ({self._prefix_matches('backlinks', 'id', 'k.priority', partner_filter, templated_filter)})
+            """)
+            # The earliest matching hop wins, then the earliest key within that hop
+            self.conn.execute(f"""
+                INSERT INTO matches
+                SELECT backlink_id, pickup_row, 'redirect hop ' || hop
+                FROM ({self._prefix_matches('hops', 'backlink_id', 't.hop, k.priority', partner_filter)})
+            """)
+
+        counts = dict(self.conn.execute("""
+            SELECT CASE WHEN matched_via LIKE 'redirect hop %' THEN 'redirect hop' ELSE matched_via END,
+                   COUNT(*)
+            FROM matches GROUP BY 1
+        """).fetchall())
+        logger.info(f"Found {sum(counts.values())} matches: " +
+                    ', '.join(f"{count} by {via}" for via, count in counts.items()))
+        return counts
+
+    def metrics(self):
+        """Report metrics computed with one aggregate query"""
+        row = self.conn.execute("""
+            SELECT COUNT(*),
+                   COUNT(m.backlink_id),
+                   AVG(CASE WHEN m.backlink_id IS NOT NULL THEN b.domain_rating END),
+                   AVG(CASE WHEN m.backlink_id IS NULL THEN b.domain_rating END),
+                   TOTAL(CASE WHEN m.backlink_id IS NOT NULL THEN b.domain_rating * b.domain_rating * 10 END),
+                   TOTAL(CASE WHEN m.backlink_id IS NULL THEN b.domain_rating * b.domain_rating * 10 END),
+                   TOTAL(CASE WHEN m.backlink_id IS NOT NULL THEN b.domain_rating END)
+            FROM backlinks b LEFT JOIN matches m ON m.backlink_id = b.id
+        """).fetchone()
+        return format_metrics(*(np.nan if value is None else value for value in row))
+
+    def dr_histograms(self):
+        """Stacker and non-Stacker link counts per Domain rating bin, like main.calculate_dr_histograms"""
+        bins = len(DR_BINS) - 1
+        width = (DR_BINS[-1] - DR_BINS[0]) / bins
+        histograms = {'Stacker DR Histogram': [0] * bins, 'Non-Stacker DR Histogram': [0] * bins}
+        # The last bin includes the upper edge, as with np.histogram
+        rows = self.conn.execute(f"""
+            SELECT m.backlink_id IS NOT NULL,
+                   MIN(CAST((b.domain_rating - {DR_BINS[0]}) / {width} AS INTEGER), {bins - 1}),
+                   COUNT(*)
+            FROM backlinks b LEFT JOIN matches m ON m.backlink_id = b.id
+            WHERE b.domain_rating BETWEEN {DR_BINS[0]} AND {DR_BINS[-1]}
+            GROUP BY 1, 2
+        """)
+        for stacker, bin_number, count in rows:
+            histograms['Stacker DR Histogram' if stacker else 'Non-Stacker DR Histogram'][bin_number] = count
+        return histograms
+
+    def iter_matched(self, chunksize=CHUNK_SIZE):
+        """Yield the match_urls output columns for every backlink, chunk by chunk"""
+        chunks = pd.read_sql_query("""
+            SELECT b.referring_url AS "Referring page URL",
+                   b.target_url AS "Target URL",
+                   b.domain_rating AS "Domain rating",
+                   b.domain_rating * b.domain_rating * 10 AS link_weight,
+                   COALESCE(p.story, '') AS matched_story,
+                   COALESCE(m.matched_via, '') AS matched_via,
+                   m.backlink_id IS NOT NULL AS is_stacker_link,
+                   COALESCE(p.story_code, -1) AS story_code,
+                   COALESCE(p.partner_code, -1) AS partner_code,
+                   COALESCE(p.publisher_code, -1) AS publisher_code
+            FROM backlinks b
+            LEFT JOIN matches m ON m.backlink_id = b.id
+            LEFT JOIN pickups p ON p.row = m.pickup_row
+            ORDER BY b.id
+        """, self.conn, chunksize=chunksize)
+        for chunk in chunks:
+            chunk['is_stacker_link'] = chunk['is_stacker_link'].astype(bool)
+            yield chunk
+
+    def export_matched(self, output_path, chunksize=CHUNK_SIZE):
+        """Write backlinks_analysis.csv without holding all rows in memory"""
+        header = True
+        for chunk in self.iter_matched(chunksize):
+            chunk.to_csv(output_path, index=False, mode='w' if header else 'a', header=header)
+            header = False
+
+    def group_aggregates(self):
+        """Story, partner and publisher group aggregates, like rollups.group_aggregates"""
+        from rollups import add_labels
+        base = pd.read_sql_query("""
+            SELECT p.story_code, p.partner_code, p.publisher_code,
+                   COUNT(*) AS links,
+                   TOTAL(b.domain_rating) AS dr_sum,
+                   TOTAL(b.domain_rating * b.domain_rating * 10) AS weight_sum
+            FROM matches m
+            JOIN backlinks b ON b.id = m.backlink_id
+            JOIN pickups p ON p.row = m.pickup_row
+            GROUP BY p.story_code, p.partner_code, p.publisher_code
+        """, self.conn).astype({
+            'story_code': np.int32, 'partner_code': np.int32, 'publisher_code': np.int32,
+            'links': np.int64, 'dr_sum': float, 'weight_sum': float
+        })
+        labels = {}
+        for name in ('story', 'partner', 'publisher', 'story_name'):
+            values = self.conn.execute(
+                "SELECT label FROM pickup_labels WHERE dimension = ? ORDER BY code", (name,)
+            ).fetchall()
+            labels[name] = np.array([value for value, in values], dtype=object)
+        return add_labels(base, labels, labels.pop('story_name'))
+
+    def acquisition_curves(self, chunksize=CHUNK_SIZE):
+        """Monthly and weekly acquisition and loss curves, like acquisition.acquisition_curves"""
+        if self.conn.execute("SELECT COUNT(first_seen) FROM backlinks").fetchone()[0] == 0:
+            return None
+        totals = {freq: None for freq in FREQUENCIES}
+        chunks = pd.read_sql_query("""
+            SELECT b.first_seen AS "First seen", b.lost_at AS "Lost", m.backlink_id IS NOT NULL AS is_stacker_link
+            FROM backlinks b LEFT JOIN matches m ON m.backlink_id = b.id
+        """, self.conn, chunksize=chunksize)
+        for chunk in chunks:
+            first_seen, lost = link_dates(chunk)
+            for freq in FREQUENCIES:
+                counts = period_counts(first_seen, lost, chunk['is_stacker_link'].astype(bool), freq)
+                totals[freq] = counts if totals[freq] is None else totals[freq].add(counts, fill_value=0)
+        return {freq: curves_from_counts(counts, freq) for freq, counts in totals.items()}
+
+    def save_snapshot(self, report, metrics, ahrefs_file=None, pickup_file=None):
+        """Record a report's metrics so history can be queried from the store"""
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?)", (
+                report,
+                datetime.now().isoformat(timespec='seconds'),
+                ahrefs_file and os.path.basename(ahrefs_file),
+                pickup_file and os.path.basename(pickup_file),
+                json.dumps(metrics)
+            ))
+
+    def snapshots(self):
+        """Report snapshots, one row per report with a column per metric"""
+        rows = self.conn.execute("SELECT report, created_at, metrics FROM snapshots ORDER BY report").fetchall()
+        return pd.DataFrame([{'Report': report, 'Created': created, **json.loads(metrics)}
+                             for report, created, metrics in rows])
+
+    def query(self, sql, params=()):
+        """Run an ad-hoc query against the store"""
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load, match and query a client's SQLite store")
+    parser.add_argument('client', help="Client name")
+    parser.add_argument('--reload', action='store_true', help="Reload the exports even if unchanged")
+    parser.add_argument('--sql', help="Run a query against the store instead of analyzing")
+    parser.add_argument('--snapshots', action='store_true', help="List stored report snapshots")
+    parser.add_argument('--output', help="Write query results to a CSV file")
+    args = parser.parse_args()
+
+    client_path = os.path.join(get_client_directory(), args.client)
+    with ClientStore.for_client(args.client) as store:
+        if args.sql or args.snapshots:
+            result = store.query(args.sql) if args.sql else store.snapshots()
+            if args.output:
+                result.to_csv(args.output, index=False)
+            else:
+                print(result.to_string(index=False))
+            return
+
+        ahrefs_file = find_ahrefs_file(client_path)
+        pickup_file = find_pickup_file(client_path)
+        if not ahrefs_file or not pickup_file:
+            raise SystemExit(f"Missing required files for {args.client}")
+        store.load(ahrefs_file, pickup_file, force=args.reload)
+
+    from pipeline import analyze_client
+    _, report_path = analyze_client(args.client, use_store=True)
+    print(report_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,6 @@ import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from tkinterdnd2 import DND_FILES
 from datetime import datetime
-import pandas as pd
 from utils import get_client_directory
 
 logger = logging.getLogger(__name__)
@@ -123,9 +122,11 @@ class FileImportDialog:
             messagebox.showerror("Error", "File must be a CSV")
             return
         
+        import pandas as pd
+        
         try:
-            # Validate file structure
-            df = pd.read_csv(file_path)
+            # Validate file structure from the header row only
+            df = pd.read_csv(file_path, nrows=0)
             if file_type == 'ahrefs' and 'Referring page URL' not in df.columns:
                 messagebox.showerror("Error", "Invalid Ahrefs file format")
                 return
@@ -1,14 +1,29 @@
 #!/usr/bin/env python3
 
+import io
 import os
+import csv
+import json
 import logging
+import importlib.util
 from datetime import datetime
 import pandas as pd
 import hashlib
+from acquisition import DATE_COLUMNS
 from utils import get_project_root, get_client_directory
 
 logger = logging.getLogger(__name__)
 
+REPORT_SUMMARY_FILE = 'summary.json'
+REPORT_COMPLETE_FILE = '.complete'  # Written last, records the report's input file hashes
+STAGING_PREFIX = '.staging-'  # Reports still being written, hidden from readers
+# Files that make up a report saved before completion markers were written
+LEGACY_REPORT_FILES = ['backlinks_analysis.csv', 'metrics.txt']
+# Files at least this large are parsed with pyarrow's multithreaded reader when it is installed
+PYARROW_MIN_BYTES = 1024 * 1024
+PYARROW_SAMPLE_ROWS = 1000  # Rows the C engine reads to pick pyarrow column types
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
 def calculate_file_hash(file_path):
     """Calculate SHA-256 hash of a file"""
     sha256_hash = hashlib.sha256()
@@ -17,23 +32,121 @@ def calculate_file_hash(file_path):
             sha256_hash.update(byte_block)
     return sha256_hash.hexdigest()
 
-def get_latest_report(client_dir):
-    """Get the most recent report directory and file hashes"""
+def file_signature(path):
+    """Cheap change check for a file: path, size and mtime"""
+    if path is None or not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return path, stat.st_size, stat.st_mtime_ns
+
+def read_report_marker(report_path):
+    """Read a report's completion marker, None if it has none"""
+    marker_path = os.path.join(report_path, REPORT_COMPLETE_FILE)
+    if not os.path.exists(marker_path):
+        return None
+    with open(marker_path) as f:
+        return json.load(f)
+
+def replace_report_file(report_path, name, write):
+    """Atomically add or replace a file in a published report
+
+    write(path) writes the new content to a temporary path, which is then
+    renamed over the report's file. The completion marker's file list is
+    updated, and the reports directory is touched so caches keyed on its
+    mtime, such as the portfolio, pick up the change.
+    """
+    path = os.path.join(report_path, name)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    marker = read_report_marker(report_path)
+    if marker is not None and name not in marker.get('files', []):
+        marker['files'] = sorted(marker.get('files', []) + [name])
+        marker_path = os.path.join(report_path, REPORT_COMPLETE_FILE)
+        with open(f"{marker_path}.{os.getpid()}.tmp", 'w') as f:
+            json.dump(marker, f)
+        os.replace(f"{marker_path}.{os.getpid()}.tmp", marker_path)
+    os.utime(os.path.dirname(os.path.normpath(report_path)))
+
+def is_complete_report(report_path):
+    """Whether a report directory was fully written
+
+    Reports without a marker predate it and count as complete if they
+    have their results and metrics.
+    """
+    if os.path.exists(os.path.join(report_path, REPORT_COMPLETE_FILE)):
+        return True
+    return all(os.path.exists(os.path.join(report_path, name)) for name in LEGACY_REPORT_FILES)
+
+def list_report_dirs(client_dir):
+    """List complete report directory names for a client, oldest first"""
     reports_dir = os.path.join(client_dir, 'reports')
     if not os.path.exists(reports_dir):
-        return None, None
+        return []
         
-    report_dirs = [d for d in os.listdir(reports_dir) 
-                  if os.path.isdir(os.path.join(reports_dir, d))]
-    
+    return sorted(d for d in os.listdir(reports_dir)
+                  if not d.startswith('.') and is_complete_report(os.path.join(reports_dir, d)))
+
+def get_latest_report_dir(client_dir):
+    """Get the most recent report directory without hashing its files"""
+    report_dirs = list_report_dirs(client_dir)
     if not report_dirs:
+        return None
+    return os.path.join(client_dir, 'reports', report_dirs[-1])
+
+def read_report_metrics(report_path):
+    """Read the metrics.txt summary of a report into a dict"""
+    metrics = {}
+    metrics_path = os.path.join(report_path, 'metrics.txt')
+    if not os.path.exists(metrics_path):
+        return metrics
+    with open(metrics_path) as f:
+        for line in f:
+            name, sep, value = line.rstrip('\n').partition(': ')
+            if sep:
+                metrics[name] = value
+    return metrics
+
+def parse_metric_value(value):
+    """Convert a metrics value such as '12.50%' into a float"""
+    try:
+        return float(str(value).rstrip('%').replace(',', ''))
+    except ValueError:
+        return None
+
+def write_report_summary(report_path, metrics, histograms=None):
+    """Write the small numeric summary record read by portfolio views and chart rendering"""
+    summary = {name: parse_metric_value(value) for name, value in metrics.items()}
+    summary.update(histograms or {})
+    with open(os.path.join(report_path, REPORT_SUMMARY_FILE), 'w') as f:
+        json.dump(summary, f)
+
+def read_report_summary(report_path):
+    """Read a report's numeric summary, falling back to metrics.txt for older reports"""
+    summary_path = os.path.join(report_path, REPORT_SUMMARY_FILE)
+    if os.path.exists(summary_path):
+        with open(summary_path) as f:
+            return json.load(f)
+    return {name: parse_metric_value(value) for name, value in read_report_metrics(report_path).items()}
+
+def get_latest_report(client_dir):
+    """Get the most recent report directory and the hashes of its input files"""
+    latest_path = get_latest_report_dir(client_dir)
+    if latest_path is None:
         return None, None
-        
-    latest_dir = max(report_dirs)
-    latest_path = os.path.join(reports_dir, latest_dir)
-    
-    # Get file hashes from the latest report
-    csv_files = [f for f in os.listdir(latest_path) if f.endswith('.csv')]
+
+    marker = read_report_marker(latest_path)
+    if marker is not None:
+        return latest_path, marker.get('inputs', {})
+
+    # Older reports have no marker, so hash the copied inputs among their CSVs
+    csv_files = [f for f in os.listdir(latest_path)
+                 if f.endswith('.csv') and (is_ahrefs_file(f) or is_pickup_file(f))]
     file_hashes = {}
     for file in csv_files:
         file_path = os.path.join(latest_path, file)
@@ -42,7 +155,7 @@ def get_latest_report(client_dir):
     return latest_path, file_hashes
 
 def files_match_latest(client_dir, current_files):
-    """Check if current files match the latest report"""
+    """Check if current input files match the inputs of the latest report"""
     latest_path, latest_hashes = get_latest_report(client_dir)
     if not latest_hashes:
         return False
@@ -54,27 +167,109 @@ def files_match_latest(client_dir, current_files):
     
     return current_hashes == latest_hashes
 
-def read_csv(file_path):
-    """Read CSV file"""
+def read_csv_header(file_path):
+    """Column names of a CSV file, read without parsing any rows"""
+    with open(file_path, newline='', encoding='utf-8-sig', errors='replace') as f:
+        return next(csv.reader(f), [])
+
+def _read_csv_pandas(file_path, usecols=None):
+    return pd.read_csv(file_path, usecols=usecols, engine='c')
+
+def _read_csv_pyarrow(file_path, usecols=None):
+    # pyarrow infers timestamps, so pin the columns the C engine reads as text to strings
+    sample = pd.read_csv(file_path, usecols=usecols, nrows=PYARROW_SAMPLE_ROWS, engine='c')
+    text_columns = {column: str for column in sample.columns
+                    if pd.api.types.is_string_dtype(sample[column]) and not sample[column].isna().all()}
+    return pd.read_csv(file_path, usecols=usecols, engine='pyarrow', dtype=text_columns)
+
+def _read_csv_stream(file_path, usecols=None):
+    """Stream rows through the csv module, skipping malformed ones"""
+    csv.field_size_limit(2 ** 31 - 1)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    skipped = 0
+    with open(file_path, newline='', encoding='utf-8-sig', errors='replace') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        keep = [i for i, name in enumerate(header) if usecols is None or name in usecols]
+        writer.writerow([header[i] for i in keep])
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                break
+            except csv.Error:
+                skipped += 1
+                continue
+            # Rows with extra fields are what the C parser rejects, short rows are padded like pandas does
+            if len(row) > len(header):
+                skipped += 1
+                continue
+            writer.writerow([row[i] if i < len(row) else '' for i in keep])
+    if skipped:
+        logger.warning(f"Skipped {skipped} malformed rows in {os.path.basename(file_path)}")
+    buffer.seek(0)
+    # Re-parse the cleaned rows so column types are inferred exactly as for the other backends
+    return pd.read_csv(buffer)
+
+CSV_BACKENDS = {
+    'pandas': _read_csv_pandas,
+    'pyarrow': _read_csv_pyarrow,
+    'stream': _read_csv_stream
+}
+
+def select_csv_backend(file_path):
+    """Fastest available backend for a file, pyarrow only pays off on large files"""
+    if PYARROW_AVAILABLE and os.path.getsize(file_path) >= PYARROW_MIN_BYTES:
+        return 'pyarrow'
+    return 'pandas'
+
+def read_csv(file_path, usecols=None, backend='auto'):
+    """Read CSV file, optionally only the named columns that exist in it
+
+    backend is 'pandas', 'pyarrow', 'stream' or 'auto' to pick by file size.
+    If the chosen parser rejects a malformed file, the streaming csv module
+    reader is used instead.
+    """
+    if usecols is not None:
+        # Resolve against the header so optional columns may be missing, which every backend accepts
+        header = read_csv_header(file_path)
+        usecols = [column for column in header if column in set(usecols)]
+    if backend == 'auto':
+        backend = select_csv_backend(file_path)
+
     try:
-        df = pd.read_csv(file_path)
-        logger.info(f"Successfully read CSV file: {file_path}")
+        try:
+            df = CSV_BACKENDS[backend](file_path, usecols)
+        except (pd.errors.ParserError, ValueError, UnicodeDecodeError) as e:
+            if backend == 'stream':
+                raise
+            logger.warning(f"{backend} parser failed on {file_path}, retrying with the stream parser: {str(e)}")
+            backend = 'stream'
+            df = CSV_BACKENDS[backend](file_path, usecols)
+        logger.info(f"Successfully read CSV file: {file_path} ({backend} parser)")
         return df
     except Exception as e:
         logger.error(f"Error reading CSV file {file_path}: {str(e)}")
         raise
 
+def is_ahrefs_file(file):
+    return file.endswith('Ahrefs.csv') or ('-backlinks-subdomains_' in file and file.endswith('.csv'))
+
+def is_pickup_file(file):
+    return file.startswith('custom_pickup_export') and file.endswith('.csv')
+
 def find_ahrefs_file(client_dir):
     """Find Ahrefs file using any supported naming pattern"""
     for file in os.listdir(client_dir):
-        if file.endswith('Ahrefs.csv') or '-backlinks-subdomains_' in file:
+        if is_ahrefs_file(file):
             return os.path.join(client_dir, file)
     return None
 
 def find_pickup_file(client_dir):
     """Find pickup export file"""
     for file in os.listdir(client_dir):
-        if file.startswith('custom_pickup_export'):
+        if is_pickup_file(file):
             return os.path.join(client_dir, file)
     return None
 
@@ -91,16 +286,17 @@ def load_client_files(client_dir, client):
             logger.error(f"Missing required files for {client}")
             return None, None
         
-        # Read files
-        ahrefs_df = read_csv(ahrefs_file)
-        pickup_df = read_csv(pickup_file)
-        
-        # Clean up Ahrefs dataframe to only keep necessary columns
+        # Only the necessary Ahrefs columns are parsed
         keep_columns = [
             'Referring page URL',
             'Domain rating',
             'Target URL'
         ]
+        optional_columns = ['Redirect Chain URLs'] + DATE_COLUMNS
+        ahrefs_df = read_csv(ahrefs_file, usecols=keep_columns + optional_columns)
+        pickup_df = read_csv(pickup_file)
+        
+        keep_columns += [c for c in optional_columns if c in ahrefs_df.columns]
         ahrefs_df = ahrefs_df[keep_columns]
         
         logger.info(f"Loaded {client}: {len(ahrefs_df)} backlinks, {len(pickup_df)} pickups")
@@ -2,29 +2,30 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-from datetime import datetime
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import os
-import shutil
 import logging
-from main import match_urls, calculate_metrics, URLProcessor
-from file_handler import (
-    load_client_files,
-    find_ahrefs_file,
-    find_pickup_file,
-    files_match_latest,
-    get_latest_report
-)
-from visualization import create_distribution_charts
+import importlib
+import threading
 from client_manager import NewClientDialog
 from file_dialog import FileImportDialog
 from tkinterdnd2 import TkinterDnD
 from utils import get_client_directory
 
+# pandas, matplotlib and the analysis modules are imported on first use so the
+# window appears quickly, then preloaded in the background once it is shown
+BACKGROUND_IMPORTS = [
+    'pandas',
+    'matplotlib.backends.backend_tkagg',
+    'main',
+    'pipeline',
+    'visualization',
+    'portfolio',
+    'tables',
+    'alerts'
+]
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -33,9 +34,6 @@ class BacklinkAnalyzerGUI:
         self.root = root
         self.root.title("Backlink Analyzer")
         
-        # Initialize URL processor
-        self.url_processor = URLProcessor()
-        
         # Get screen dimensions and set size
         screen_width = self.root.winfo_screenwidth()
         screen_height = self.root.winfo_screenheight()
@@ -61,6 +59,13 @@ class BacklinkAnalyzerGUI:
         
         # Load clients
         self.load_available_clients()
+        
+        # Warm up heavy imports once the window is on screen
+        self.root.after(200, self.start_background_imports)
+
+    def start_background_imports(self):
+        """Import analysis modules in a background thread"""
+        threading.Thread(target=preload_modules, daemon=True).start()
 
     def setup_client_selection(self):
         """Setup the client selection dropdown and buttons"""
@@ -164,6 +169,264 @@ class BacklinkAnalyzerGUI:
             value_label = ttk.Label(frame, text="-", font=("Helvetica", 12))
             value_label.pack(anchor=W)
             self.metric_labels[name] = value_label
+        
+        self.setup_results_tab()
+        self.setup_rollups_tab()
+        self.setup_trends_tab()
+        self.setup_alerts_tab()
+        self.setup_portfolio_tab()
+
+    def setup_results_tab(self):
+        """Setup the tab listing matched backlinks with sort and filter controls"""
+        self.results_frame = ttk.Frame(self.notebook, padding="10")
+        self.notebook.add(self.results_frame, text='Results')
+        self.results_frame.columnconfigure(0, weight=1)
+        self.results_frame.rowconfigure(1, weight=1)
+        
+        # Filter controls
+        filters = ttk.Frame(self.results_frame)
+        filters.grid(row=0, column=0, sticky="ew", pady=(0, 10))
+        
+        self.story_filter = tk.StringVar()
+        self.domain_filter = tk.StringVar()
+        self.dr_min_filter = tk.StringVar(value="0")
+        self.dr_max_filter = tk.StringVar(value="100")
+        self.stacker_filter = tk.StringVar(value="All")
+        
+        ttk.Label(filters, text="Story:").pack(side=LEFT, padx=(0, 2))
+        story_entry = ttk.Entry(filters, textvariable=self.story_filter, width=25)
+        story_entry.pack(side=LEFT, padx=(0, 10))
+        ttk.Label(filters, text="Domain:").pack(side=LEFT, padx=(0, 2))
+        domain_entry = ttk.Entry(filters, textvariable=self.domain_filter, width=20)
+        domain_entry.pack(side=LEFT, padx=(0, 10))
+        ttk.Label(filters, text="DR:").pack(side=LEFT, padx=(0, 2))
+        ttk.Spinbox(filters, from_=0, to=100, textvariable=self.dr_min_filter, width=5).pack(side=LEFT)
+        ttk.Label(filters, text="to").pack(side=LEFT, padx=2)
+        ttk.Spinbox(filters, from_=0, to=100, textvariable=self.dr_max_filter, width=5).pack(side=LEFT, padx=(0, 10))
+        ttk.Combobox(
+            filters,
+            textvariable=self.stacker_filter,
+            values=["All", "Stacker", "Non-Stacker"],
+            state="readonly",
+            width=12
+        ).pack(side=LEFT, padx=(0, 10))
+        ttk.Button(
+            filters,
+            text="Apply",
+            command=self.apply_results_filter,
+            style="secondary.TButton"
+        ).pack(side=LEFT)
+        
+        self.results_count = ttk.Label(filters, text="")
+        self.results_count.pack(side=RIGHT)
+        for entry in (story_entry, domain_entry):
+            entry.bind('<Return>', lambda e: self.apply_results_filter())
+        
+        # Table is created with the first results
+        self.results_table = None
+        self.results_view = None
+
+    def show_results(self, matched_df):
+        """Load matched backlinks into the results table"""
+        from tables import ResultsView, VirtualTable
+        
+        if self.results_table is None:
+            self.results_table = VirtualTable(self.results_frame)
+            self.results_table.frame.grid(row=1, column=0, sticky="nsew")
+        self.results_view = ResultsView(matched_df)
+        self.apply_results_filter()
+
+    def apply_results_filter(self):
+        """Apply the filter controls to the results table"""
+        if self.results_view is None:
+            return
+        try:
+            dr_min = float(self.dr_min_filter.get() or 0)
+            dr_max = float(self.dr_max_filter.get() or 100)
+        except ValueError:
+            messagebox.showwarning("Warning", "DR range must be numbers")
+            return
+        
+        stacker = {"Stacker": True, "Non-Stacker": False}.get(self.stacker_filter.get())
+        self.results_view.filter(
+            story=self.story_filter.get().strip(),
+            domain=self.domain_filter.get().strip(),
+            dr_min=dr_min,
+            dr_max=dr_max,
+            stacker=stacker
+        )
+        self.results_table.set_view(self.results_view)
+        self.results_count.config(text=f"Showing {len(self.results_view):,d} of {len(self.results_view.df):,d} links")
+
+    def setup_rollups_tab(self):
+        """Setup the tab with per-story, per-partner and per-publisher totals"""
+        self.rollups_frame = ttk.Frame(self.notebook, padding="10")
+        self.notebook.add(self.rollups_frame, text='Rollups')
+        self.rollups_frame.columnconfigure(0, weight=1)
+        self.rollups_frame.rowconfigure(1, weight=1)
+        
+        self.rollup_dimension = tk.StringVar(value="Story")
+        dimension_dropdown = ttk.Combobox(
+            self.rollups_frame,
+            textvariable=self.rollup_dimension,
+            values=["Story", "Partner", "Publisher"],
+            state="readonly",
+            width=15
+        )
+        dimension_dropdown.grid(row=0, column=0, sticky="w", pady=(0, 10))
+        dimension_dropdown.bind('<<ComboboxSelected>>', lambda e: self.show_rollup())
+        
+        # Table is created with the first report
+        self.rollups_table = None
+        self.rollup_aggregates = None
+
+    def show_rollups(self, report_path):
+        """Load a report's group aggregates into the rollups tab"""
+        from rollups import load_rollups
+        
+        self.rollup_aggregates = load_rollups(report_path)
+        self.show_rollup()
+
+    def show_rollup(self):
+        """Show the rollup for the selected dimension"""
+        from rollups import rollup
+        from tables import SortableTable
+        import pandas as pd
+        
+        if self.rollups_table is None:
+            self.rollups_table = SortableTable(self.rollups_frame)
+            self.rollups_table.frame.grid(row=1, column=0, sticky="nsew")
+        if self.rollup_aggregates is None:
+            self.rollups_table.set_data(pd.DataFrame({'No rollups saved with this report': []}))
+            return
+        self.rollups_table.set_data(rollup(self.rollup_aggregates, self.rollup_dimension.get()))
+
+    def setup_trends_tab(self):
+        """Setup the tab with link acquisition and loss curves"""
+        self.trends_frame = ttk.Frame(self.notebook, padding="10")
+        self.notebook.add(self.trends_frame, text='Trends')
+        self.trends_frame.columnconfigure(0, weight=1)
+        self.trends_frame.rowconfigure(1, weight=1)
+        
+        self.trend_frequency = tk.StringVar(value="Monthly")
+        frequency_dropdown = ttk.Combobox(
+            self.trends_frame,
+            textvariable=self.trend_frequency,
+            values=["Monthly", "Weekly"],
+            state="readonly",
+            width=15
+        )
+        frequency_dropdown.grid(row=0, column=0, sticky="w", pady=(0, 10))
+        frequency_dropdown.bind('<<ComboboxSelected>>', lambda e: self.show_trend())
+        
+        self.trend_chart_frame = ttk.Frame(self.trends_frame)
+        self.trend_chart_frame.grid(row=1, column=0, sticky="nsew")
+        self.trend_chart_frame.columnconfigure(0, weight=1)
+        self.trend_chart_frame.rowconfigure(0, weight=1)
+        self.acquisition_curves = None
+
+    def show_trends(self, report_path):
+        """Load a report's acquisition curves into the trends tab"""
+        from acquisition import load_acquisition
+        
+        self.acquisition_curves = load_acquisition(report_path)
+        self.show_trend()
+
+    def show_trend(self):
+        """Plot the acquisition curves for the selected frequency"""
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from visualization import create_acquisition_chart
+        
+        for widget in self.trend_chart_frame.winfo_children():
+            widget.destroy()
+        if self.acquisition_curves is None:
+            ttk.Label(self.trend_chart_frame, text="No First seen dates saved with this report").grid(row=0, column=0)
+            return
+        
+        frequency = self.trend_frequency.get()
+        fig = create_acquisition_chart(
+            self.acquisition_curves[frequency.lower()],
+            title=f'{frequency} Link Acquisition and Loss'
+        )
+        canvas = FigureCanvasTkAgg(fig, master=self.trend_chart_frame)
+        canvas.draw()
+        canvas.get_tk_widget().grid(row=0, column=0, sticky="nsew")
+
+    def setup_alerts_tab(self):
+        """Setup the tab with recent report alerts for the selected client or every client"""
+        self.alerts_frame = ttk.Frame(self.notebook, padding="10")
+        self.notebook.add(self.alerts_frame, text='Alerts')
+        self.alerts_frame.columnconfigure(0, weight=1)
+        self.alerts_frame.rowconfigure(1, weight=1)
+        
+        self.alerts_scope = tk.StringVar(value="Selected Client")
+        scope_dropdown = ttk.Combobox(
+            self.alerts_frame,
+            textvariable=self.alerts_scope,
+            values=["Selected Client", "All Clients"],
+            state="readonly",
+            width=15
+        )
+        scope_dropdown.grid(row=0, column=0, sticky="w", pady=(0, 10))
+        scope_dropdown.bind('<<ComboboxSelected>>', lambda e: self.show_alerts())
+        
+        # Table is created with the first alerts shown
+        self.alerts_table = None
+
+    def show_alerts(self):
+        """Show the most recent alerts from the client or global alert log"""
+        from alerts import load_alerts
+        from tables import SortableTable
+        
+        if self.alerts_table is None:
+            self.alerts_table = SortableTable(self.alerts_frame)
+            self.alerts_table.frame.grid(row=1, column=0, sticky="nsew")
+        client = self.client_var.get() if self.alerts_scope.get() == "Selected Client" else None
+        try:
+            self.alerts_table.set_data(load_alerts(client or None))
+        except Exception as e:
+            logger.error(f"Error loading alerts: {str(e)}")
+
+    def setup_portfolio_tab(self):
+        """Setup the tab comparing latest metrics across all clients"""
+        self.portfolio_frame = ttk.Frame(self.notebook, padding="10")
+        self.notebook.add(self.portfolio_frame, text='Portfolio')
+        self.portfolio_frame.columnconfigure(0, weight=1)
+        self.portfolio_frame.rowconfigure(1, weight=1)
+        
+        ttk.Button(
+            self.portfolio_frame,
+            text="Refresh",
+            command=self.load_portfolio_view,
+            style="secondary.TButton"
+        ).grid(row=0, column=0, sticky="w", pady=(0, 10))
+        
+        # Table is created on first visit to the tab
+        self.portfolio_table = None
+        self.portfolio_loaded = False
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+
+    def on_tab_changed(self, event):
+        """Load tab contents lazily the first time a tab is shown"""
+        if self.notebook.select() == str(self.portfolio_frame) and not self.portfolio_loaded:
+            self.load_portfolio_view()
+        elif self.notebook.select() == str(self.alerts_frame):
+            self.show_alerts()
+
+    def load_portfolio_view(self):
+        """Load latest metrics for every client into the portfolio table"""
+        from portfolio import load_portfolio
+        from tables import SortableTable
+        
+        try:
+            if self.portfolio_table is None:
+                self.portfolio_table = SortableTable(self.portfolio_frame)
+                self.portfolio_table.frame.grid(row=1, column=0, sticky="nsew")
+            self.portfolio_table.set_data(load_portfolio())
+            self.portfolio_loaded = True
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load portfolio: {str(e)}")
+            logger.error(f"Error loading portfolio: {str(e)}")
 
     def create_new_client(self):
         """Open the new client dialog"""
@@ -187,6 +450,9 @@ class BacklinkAnalyzerGUI:
 
     def create_charts(self, df):
         """Create analysis charts"""
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from visualization import create_distribution_charts
+        
         # Clear previous charts
         for widget in self.charts_frame.winfo_children():
             widget.destroy()
@@ -203,6 +469,8 @@ class BacklinkAnalyzerGUI:
 
     def on_window_resize(self):
         """Handle window resize events"""
+        import matplotlib.pyplot as plt
+        
         try:
             plt.close('all')
             for widget in self.charts_frame.winfo_children():
@@ -236,52 +504,12 @@ class BacklinkAnalyzerGUI:
         if not client:
             messagebox.showwarning("Warning", "Please select a client")
             return
-            
+        
+        from main import calculate_metrics
+        from pipeline import analyze_client as run_client_analysis
+        
         try:
-            # Load and process data
-            client_path = os.path.join(get_client_directory(), client)
-            ahrefs_df, pickup_df = load_client_files(get_client_directory(), client)
-            if ahrefs_df is None or pickup_df is None:
-                raise Exception("Failed to load client files")
-            
-            # Check if files match latest report
-            current_files = {
-                'ahrefs': find_ahrefs_file(client_path),
-                'pickup': find_pickup_file(client_path)
-            }
-            
-            if files_match_latest(client_path, current_files):
-                # Use latest report instead of reprocessing
-                latest_path, _ = get_latest_report(client_path)
-                matched_df = pd.read_csv(os.path.join(latest_path, 'backlinks_analysis.csv'))
-                logger.info(f"Using existing report from {os.path.basename(latest_path)}")
-            else:
-                # Process new data
-                logger.info("Processing new data...")
-                matched_df = match_urls(ahrefs_df, pickup_df)
-                logger.info("URL matching complete")
-                metrics = calculate_metrics(matched_df)
-                logger.info("Metrics calculation complete")
-                
-                # Create new report directory
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                report_dir = os.path.join(client_path, 'reports', timestamp)
-                os.makedirs(report_dir, exist_ok=True)
-                
-                # Save processed CSV
-                results_path = os.path.join(report_dir, 'backlinks_analysis.csv')
-                matched_df.to_csv(results_path, index=False)
-                
-                # Save metrics
-                metrics_path = os.path.join(report_dir, 'metrics.txt')
-                with open(metrics_path, 'w') as f:
-                    for metric, value in metrics.items():
-                        f.write(f"{metric}: {value}\n")
-                
-                # Copy input files
-                for file_type, file_path in current_files.items():
-                    if file_path:
-                        shutil.copy2(file_path, report_dir)
+            matched_df, report_path = run_client_analysis(client)
             
             # Update display
             metrics = calculate_metrics(matched_df)
@@ -291,10 +519,24 @@ class BacklinkAnalyzerGUI:
             # Create charts
             self.create_charts(matched_df)
             
+            # Fill results table
+            self.show_results(matched_df)
+            self.show_rollups(report_path)
+            self.show_trends(report_path)
+            self.show_alerts()
+            
         except Exception as e:
             messagebox.showerror("Error", f"Analysis failed: {str(e)}")
             logger.error(f"Error analyzing {client}: {str(e)}")
 
+def preload_modules():
+    """Import BACKGROUND_IMPORTS so first use of analysis features is instant"""
+    for name in BACKGROUND_IMPORTS:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            logger.error(f"Error preloading {name}: {str(e)}")
+
 def main():
     root = TkinterDnD.Tk()
     style = ttk.Style(theme='litera')
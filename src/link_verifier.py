@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+import argparse
+from datetime import datetime
+from urllib.parse import urljoin, urlsplit
+import aiohttp
+import pandas as pd
+from main import URLProcessor
+from file_handler import get_latest_report_dir, read_report_summary, replace_report_file, REPORT_SUMMARY_FILE
+from utils import get_client_directory
+
+logger = logging.getLogger(__name__)
+
+VERIFICATION_FILE = 'link_verification.csv'
+CACHE_FILE = '.verification_cache.json'
+DEFAULT_CONCURRENCY = 200
+DEFAULT_PER_HOST = 4
+DEFAULT_RETRIES = 2
+DEFAULT_TIMEOUT = 20  # Seconds to connect, and between reads of a response
+CACHE_TTL = 7 * 24 * 3600  # Seconds a cached page check stays valid
+MAX_BODY_BYTES = 2 * 1024 * 1024
+READ_CHUNK_BYTES = 64 * 1024
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+USER_AGENT = 'Mozilla/5.0 (compatible; BigBacklinkVerifier/1.0)'
+
+_HREF = re.compile(rb'''href\s*=\s*["']?([^"'\s>]+)''', re.IGNORECASE)
+
+
+def normalize_link(url):
+    """Cleaned domain+path used to compare a page's links with a target URL"""
+    try:
+        domain, path = URLProcessor.split_url(url)
+    except Exception:
+        return None
+    return f"{domain}{path}"
+
+
+def extract_links(base_url, body):
+    """Set of normalized absolute links found in an HTML body, resolving relative ones against base_url"""
+    links = set()
+    for href in _HREF.findall(body):
+        href = href.decode('utf-8', errors='ignore')
+        if href.startswith(('#', 'mailto:', 'javascript:', 'tel:')):
+            continue
+        link = normalize_link(urljoin(base_url, href))
+        if link:
+            links.add(link)
+    return links
+
+
+class ResponseCache:
+    """Page check results from earlier runs, keyed by referring page URL"""
+
+    def __init__(self, path=None, ttl=CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.entries = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                logger.error(f"Error reading verification cache: {str(e)}")
+
+    def get(self, page_url):
+        entry = self.entries.get(page_url)
+        if entry and time.time() - entry['checked_at'] < self.ttl:
+            return entry
+        return None
+
+    def put(self, page_url, entry):
+        self.entries[page_url] = entry
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+
+class LinkVerifier:
+    """Fetches referring pages concurrently and checks they still link to their targets
+
+    Connections are pooled by one aiohttp session. Requests wait for a
+    global and a per-host slot before they are sent, so time spent queued
+    behind other pages on the same host never counts against the socket
+    timeouts. Each distinct page is fetched at most once
+    per run. Cached results are reused within the cache TTL, and only the
+    links pointing at checked targets are stored.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                 retries=DEFAULT_RETRIES, timeout=DEFAULT_TIMEOUT, cache=None):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.retries = retries
+        self.timeout = timeout
+        self.cache = cache or ResponseCache()
+        self._slots = None
+        self._host_slots = {}
+
+    def _host_slot(self, page_url):
+        host = urlsplit(page_url).hostname or ''
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.per_host)
+        return self._host_slots[host]
+
+    @staticmethod
+    async def read_body(response):
+        """Read a response body until EOF or MAX_BODY_BYTES"""
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(READ_CHUNK_BYTES):
+            body += chunk
+            if len(body) >= MAX_BODY_BYTES:
+                break
+        return bytes(body[:MAX_BODY_BYTES])
+
+    async def fetch(self, session, page_url):
+        """GET a page with retries, returning (status, body, final URL after redirects, error)"""
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(2 ** (attempt - 1))
+            try:
+                async with self._host_slot(page_url), self._slots:
+                    async with session.get(page_url, allow_redirects=True) as response:
+                        if response.status in RETRY_STATUSES and attempt < self.retries:
+                            error = f"HTTP {response.status}"
+                            continue
+                        body = await self.read_body(response)
+                        return response.status, body, str(response.url), None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = str(e) or type(e).__name__
+        return None, b'', page_url, error
+
+    async def check_page(self, session, page_url, targets):
+        """Check one referring page against every target URL linked from it"""
+        cached = self.cache.get(page_url)
+        if cached is not None and all(t in cached['targets'] for t in targets):
+            return cached
+
+        status, body, final_url, error = await self.fetch(session, page_url)
+        # Relative links are relative to the page actually served, not the one requested
+        links = extract_links(final_url, body) if body else set()
+        entry = {
+            'status': status,
+            'error': error,
+            'checked_at': time.time(),
+            'targets': {target: normalize_link(target) in links for target in targets}
+        }
+        # Failed fetches are retried next run rather than cached
+        if status is not None:
+            self.cache.put(page_url, entry)
+        return entry
+
+    async def verify_async(self, pairs):
+        """Verify (referring page, target) pairs, returning {page: cache entry}"""
+        targets_by_page = {}
+        for page_url, target_url in pairs:
+            targets_by_page.setdefault(page_url, set()).add(target_url)
+
+        # Slots are bound to the running event loop, so they are created per run
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._host_slots = {}
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host)
+        # Socket timeouts only, a total timeout would also count waiting for a pooled connection
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers={'User-Agent': USER_AGENT}) as session:
+            pages = list(targets_by_page)
+            entries = await asyncio.gather(*(
+                self.check_page(session, page, targets_by_page[page]) for page in pages
+            ))
+        return dict(zip(pages, entries))
+
+    def verify(self, pairs):
+        return asyncio.run(self.verify_async(pairs))
+
+
+def verify_links(df: pd.DataFrame, verifier=None) -> pd.DataFrame:
+    """Verify each row's Referring page URL still links to its Target URL"""
+    verifier = verifier or LinkVerifier()
+    pairs = list(zip(df['Referring page URL'], df['Target URL']))
+    start = time.perf_counter()
+    entries = verifier.verify(pairs)
+    logger.info(f"Checked {len(entries)} pages in {time.perf_counter() - start:.1f}s")
+
+    rows = []
+    for page_url, target_url in pairs:
+        entry = entries[page_url]
+        rows.append({
+            'Referring page URL': page_url,
+            'Target URL': target_url,
+            'http_status': entry['status'],
+            'link_found': entry['targets'].get(target_url, False),
+            'verify_error': entry['error'] or '',
+            'verified_at': datetime.fromtimestamp(entry['checked_at']).strftime('%Y-%m-%d %H:%M:%S')
+        })
+    return pd.DataFrame(rows, index=df.index)
+
+
+def verify_report(client, report_path=None, all_links=False, verifier=None, client_dir=None):
+    """Verify a report's matched links and write the results into the report directory"""
+    client_path = os.path.join(client_dir or get_client_directory(), client)
+    report_path = report_path or get_latest_report_dir(client_path)
+    if report_path is None:
+        raise FileNotFoundError(f"No reports for {client}")
+
+    matched_df = pd.read_csv(os.path.join(report_path, 'backlinks_analysis.csv'))
+    if 'Target URL' not in matched_df.columns:
+        raise ValueError("Report has no Target URL column, re-run the analysis first")
+    if not all_links:
+        matched_df = matched_df[matched_df['is_stacker_link']]
+
+    if verifier is None:
+        verifier = LinkVerifier(cache=ResponseCache(os.path.join(client_path, CACHE_FILE)))
+    results = verify_links(matched_df, verifier)
+    verifier.cache.save()
+
+    # Published reports are only changed by atomic replacement
+    replace_report_file(report_path, VERIFICATION_FILE, lambda path: results.to_csv(path, index=False))
+
+    # Add live/missing counts to the report summary
+    live = int(results['link_found'].sum())
+    summary = read_report_summary(report_path)
+    summary['Verified Live Links'] = live
+    summary['Verified Missing Links'] = len(results) - live
+
+    def write_summary(path):
+        with open(path, 'w') as f:
+            json.dump(summary, f)
+    replace_report_file(report_path, REPORT_SUMMARY_FILE, write_summary)
+
+    logger.info(f"Verified {len(results)} links for {client}: {live} live, {len(results) - live} missing")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check matched backlinks are still live")
+    parser.add_argument('client', help="Client name")
+    parser.add_argument('--report', help="Report directory name (defaults to the latest)")
+    parser.add_argument('--all-links', action='store_true', help="Verify non-Stacker links too")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST)
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES)
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT)
+    args = parser.parse_args()
+
+    client_path = os.path.join(get_client_directory(), args.client)
+    report_path = os.path.join(client_path, 'reports', args.report) if args.report else None
+    verifier = LinkVerifier(
+        concurrency=args.concurrency,
+        per_host=args.per_host,
+        retries=args.retries,
+        timeout=args.timeout,
+        cache=ResponseCache(os.path.join(client_path, CACHE_FILE))
+    )
+    verify_report(args.client, report_path, args.all_links, verifier)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,10 @@
 #!/usr/bin/env python3
 
-import os
 import logging
-from datetime import datetime
+import numpy as np
 import pandas as pd
 from urllib.parse import urlparse
-from tqdm import tqdm
+from weight_models import frame_features, model_weights
 
 logging.basicConfig(
     level=logging.INFO,
@@ -14,20 +13,40 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 PATH_LENGTH = 10  # Optimal path length based on analysis
+# Pickup export columns that matched links are coded by
+PICKUP_DIMENSIONS = {
+    'story': 'Story ID',
+    'partner': 'Partner',
+    'publisher': 'Publisher'
+}
+REDIRECT_CHAIN_SEPARATOR = r'\s+|,\s+'  # Hops in the Ahrefs 'Redirect Chain URLs' column
+DR_BINS = np.linspace(0, 100, 11)  # Domain rating histogram bins saved with reports and charted
 
 class URLProcessor:
     @staticmethod
-    def clean_url(url, truncate=None):
-        """Extract and clean domain from URL, optionally truncating path"""
+    def split_url(url):
+        """Split URL into cleaned domain and path"""
         if url.startswith('//'):
             url = f"https:{url}"
         elif not url.startswith(('http://', 'https://')):
             url = f'https://{url}'
         
+        parsed = urlparse(url)
+        domain = parsed.netloc.replace('www.', '').lower()
+        path = parsed.path.rstrip('/').lower()
+        return domain, path
+
+    @staticmethod
+    def extract_domains(urls: pd.Series) -> pd.Series:
+        """Vectorized version of the domain part of split_url"""
+        netloc = urls.astype(str).str.extract(r'^(?:https?://|//)?([^/?#]*)', expand=False)
+        return netloc.str.replace('www.', '', regex=False).str.lower()
+
+    @staticmethod
+    def clean_url(url, truncate=None):
+        """Extract and clean domain from URL, optionally truncating path"""
         try:
-            parsed = urlparse(url)
-            domain = parsed.netloc.replace('www.', '').lower()
-            path = parsed.path.rstrip('/').lower()
+            domain, path = URLProcessor.split_url(url)
             if truncate is not None:
                 path = path[:truncate]
             return f"{domain}{path}"
@@ -44,82 +63,232 @@ class URLProcessor:
     def clean_backlink_url(self, url):
         return self.processor(url)
 
-def match_urls(ahrefs_df: pd.DataFrame, pickup_df: pd.DataFrame) -> pd.DataFrame:
-    """Match backlinks against pickup URLs using optimized path length"""
+class PickupIndex:
+    """Pickup URLs truncated to PATH_LENGTH and grouped by domain for prefix lookups"""
+
+    def __init__(self, pickup_df: pd.DataFrame, path_length=PATH_LENGTH):
+        story_title_col = 'Story Name' if 'Story Name' in pickup_df.columns else 'Title'
+        self.path_length = path_length
+        self.story_titles = pickup_df[story_title_col].tolist()
+        self.pickup_count = 0
+        # domain -> {truncated path: (priority, pickup row)}
+        self.keys = {}
+        
+        for row, url in enumerate(pickup_df['URL']):
+            try:
+                domain, path = URLProcessor.split_url(url)
+            except Exception:
+                logger.error(f"Error cleaning URL: {url}")
+                continue
+            path = path[:path_length]
+            # Skip pickup URLs that are just domains
+            if not path:
+                continue
+            self.pickup_count += 1
+            domain_keys = self.keys.setdefault(domain, {})
+            # Duplicate keys keep their first position but take the latest story, like a dict
+            priority = domain_keys[path][0] if path in domain_keys else len(domain_keys)
+            domain_keys[path] = (priority, row)
+        
+        # Distinct key lengths per domain bound the prefixes a lookup has to try
+        self.lengths = {
+            domain: sorted({len(path) for path in domain_keys})
+            for domain, domain_keys in self.keys.items()
+        }
+        
+        # Compact integer codes per pickup row for story, partner and publisher rollups
+        self.codes = {}
+        self.labels = {}
+        for name, column in PICKUP_DIMENSIONS.items():
+            if column not in pickup_df.columns and name == 'story':
+                column = story_title_col
+            if column in pickup_df.columns:
+                codes, uniques = pd.factorize(pickup_df[column])
+                self.codes[name] = codes.astype(np.int32)
+                self.labels[name] = np.asarray(uniques, dtype=object)
+            else:
+                self.codes[name] = np.full(len(pickup_df), -1, dtype=np.int32)
+                self.labels[name] = np.empty(0, dtype=object)
+        
+        # Story name for each story code
+        story_names = pd.Series(self.story_titles).groupby(self.codes['story']).first()
+        self.story_names = story_names.reindex(range(len(self.labels['story']))).to_numpy(dtype=object)
+
+    def lookup(self, url):
+        """Return the pickup row matched by a backlink URL, or -1"""
+        try:
+            domain, path = URLProcessor.split_url(url)
+        except Exception:
+            return -1
+        domain_keys = self.keys.get(domain)
+        if not domain_keys:
+            return -1
+        
+        best = None
+        for length in self.lengths[domain]:
+            if length > len(path):
+                break
+            hit = domain_keys.get(path[:length])
+            if hit is not None and (best is None or hit[0] < best[0]):
+                best = hit
+        return best[1] if best is not None else -1
+
+    def match(self, urls: pd.Series) -> np.ndarray:
+        """Look up each distinct URL once and return matched pickup rows (-1 for none)"""
+        rows = {url: self.lookup(url) for url in urls.unique()}
+        return urls.map(rows).to_numpy(dtype=np.int64)
+
+    def stories(self, rows: np.ndarray) -> np.ndarray:
+        """Story titles for matched pickup rows, '' where unmatched"""
+        titles = np.array(self.story_titles + [''], dtype=object)
+        return titles[np.where(rows >= 0, rows, len(self.story_titles))]
+
+    def dimension_codes(self, rows: np.ndarray) -> dict:
+        """Story, partner and publisher codes for matched pickup rows, -1 where unmatched"""
+        return {
+            name: np.append(codes, np.int32(-1))[np.where(rows >= 0, rows, len(codes))]
+            for name, codes in self.codes.items()
+        }
+
+def match_redirect_chains(chains: pd.Series, pickup_index, partner_domains=None) -> pd.DataFrame:
+    """Match every hop of the given redirect chains in one batch
+
+    Returns one row per backlink (indexed like chains) whose chain matched,
+    with the pickup row and the 1-based number of the first matching hop.
+    """
+    hops = chains.dropna().astype(str).str.strip().str.split(REDIRECT_CHAIN_SEPARATOR).explode()
+    hops = hops[hops.notna() & (hops.str.len() > 0)]
+    hop_numbers = hops.groupby(level=0).cumcount() + 1
+    
+    if partner_domains is not None:
+        on_partner = URLProcessor.extract_domains(hops).isin(partner_domains)
+        hops = hops[on_partner]
+        hop_numbers = hop_numbers[on_partner]
+    
+    hop_rows = pickup_index.match(hops) if len(hops) else np.empty(0, dtype=np.int64)
+    matched = pd.DataFrame({'pickup_row': hop_rows, 'hop': hop_numbers.to_numpy()}, index=hops.index)
+    matched = matched[matched['pickup_row'] >= 0]
+    # Hops keep chain order, so the first entry per backlink is its earliest matching hop
+    return matched[~matched.index.duplicated(keep='first')]
+
+def match_urls(ahrefs_df: pd.DataFrame, pickup_df: pd.DataFrame, template_matcher=None,
+               pickup_index=None, partner_domains=None, weight_model=None,
+               template_keys=None) -> pd.DataFrame:
+    """Match backlinks against pickup URLs using optimized path length
+
+    If a url_templates.TemplateMatcher is given, backlinks whose path fits
+    a partner URL template are joined to pickups by their extracted template
+    keys only, and never by path prefix. Backlinks whose referring page does
+    not match are retried through the hops of their Ahrefs redirect chain.
+    A prebuilt PickupIndex for pickup_df can be passed to skip rebuilding it, and a set
+    of known partner domains (see partner_index) rejects other backlinks
+    before any path matching. link_weight comes from weight_model, a
+    weight_models spec defaulting to DR ** 2 * 10. Pickup template keys
+    from template_matcher.index_pickups can be passed to skip re-extracting
+    them.
+    """
     logger.info("Starting URL matching process...")
     
     # Create a copy of the dataframe for modifications
     df = ahrefs_df.copy()
     logger.info(f"Processing {len(df)} backlinks")
     
-    # Clean and truncate pickup URLs
-    story_title_col = 'Story Name' if 'Story Name' in pickup_df.columns else 'Title'
-    pickup_urls = pickup_df[['URL', story_title_col]].copy()
-    pickup_urls.rename(columns={story_title_col: 'story_title'}, inplace=True)
-    
-    # Initialize URL processor
-    url_processor = URLProcessor()
-    
-    logger.info("Cleaning pickup URLs...")
-    pickup_urls['clean_url'] = pickup_urls['URL'].apply(url_processor.clean_pickup_url)
-    
-    # Filter out pickup URLs that are just domains
-    pickup_urls = pickup_urls[pickup_urls['clean_url'].str.contains('/')]
-    logger.info(f"Using {len(pickup_urls)} pickup URLs with paths")
-    
-    logger.info("Cleaning backlink URLs...")
-    df.loc[:, 'clean_url'] = df['Referring page URL'].apply(url_processor.clean_backlink_url)
+    if pickup_index is None:
+        logger.info("Indexing pickup URLs...")
+        pickup_index = PickupIndex(pickup_df)
+    logger.info(f"Using {pickup_index.pickup_count} pickup URLs with paths")
     
     logger.info("Calculating link weights...")
-    df.loc[:, 'link_weight'] = df['Domain rating'] ** 2 * 10
+    df.loc[:, 'link_weight'] = model_weights(frame_features(df), weight_model)
     
-    # Initialize match columns
-    df.loc[:, 'is_stacker_link'] = False
-    df.loc[:, 'matched_story'] = ''
+    # Only backlinks on partner domains can match
+    if partner_domains is not None:
+        candidates = URLProcessor.extract_domains(df['Referring page URL']).isin(partner_domains).to_numpy()
+        logger.info(f"{int(candidates.sum())} backlinks are on known partner domains")
+    else:
+        candidates = np.ones(len(df), dtype=bool)
     
-    # Create dictionary of pickup URLs for faster lookup
-    pickup_dict = dict(zip(pickup_urls['clean_url'], pickup_urls['story_title']))
+    pickup_rows = np.full(len(df), -1, dtype=np.int64)
+    matched_via = np.full(len(df), '', dtype=object)
+    
+    # Template URLs are joined by their id first, since unrelated stories on a
+    # partner domain often share their first PATH_LENGTH path characters
+    templated = np.zeros(len(df), dtype=bool)
+    if template_matcher is not None:
+        logger.info("Matching URLs against URL templates...")
+        template_rows, template_mask = template_matcher.resolve(
+            df.loc[candidates, 'Referring page URL'], pickup_df['URL'], template_keys
+        )
+        templated[candidates] = template_mask.to_numpy()
+        pickup_rows[candidates] = template_rows.to_numpy()
+        matched_via[pickup_rows >= 0] = 'url template'
+        logger.info(f"Found {int((pickup_rows >= 0).sum())} template matches "
+                    f"among {int(templated.sum())} template URLs")
     
     # Find matches, requiring content after domain
     logger.info("Finding URL matches...")
-    matches = 0
-    urls_with_paths = df[df['clean_url'].str.contains('/')].index
-    total_urls = len(urls_with_paths)
-    
     try:
-        batch_size = 1000
-        for i in range(0, total_urls, batch_size):
-            batch_indices = urls_with_paths[i:i+batch_size]
-            if i % (batch_size * 10) == 0:
-                logger.info(f"Processed {i}/{total_urls} URLs...")
-            
-            for idx in batch_indices:
-                clean_url = df.loc[idx, 'clean_url']
-                for pickup_url, story_title in pickup_dict.items():
-                    if clean_url.startswith(pickup_url):
-                        df.loc[idx, 'is_stacker_link'] = True
-                        df.loc[idx, 'matched_story'] = story_title
-                        matches += 1
-                        break
-    
-        logger.info(f"Found {matches} matches")
+        prefix_candidates = candidates & ~templated
+        pickup_rows[prefix_candidates] = pickup_index.match(df.loc[prefix_candidates, 'Referring page URL'])
+        matched_via[prefix_candidates & (pickup_rows >= 0)] = 'referring page'
+        logger.info(f"Found {int((prefix_candidates & (pickup_rows >= 0)).sum())} matches")
     except Exception as e:
         logger.error(f"Error during URL matching: {str(e)}")
         raise
     
+    if 'Redirect Chain URLs' in df.columns:
+        logger.info("Matching redirect chains of unmatched backlinks...")
+        hop_matches = match_redirect_chains(
+            df.loc[pickup_rows < 0, 'Redirect Chain URLs'],
+            pickup_index,
+            partner_domains
+        )
+        positions = df.index.get_indexer(hop_matches.index)
+        pickup_rows[positions] = hop_matches['pickup_row'].to_numpy()
+        matched_via[positions] = 'redirect hop ' + hop_matches['hop'].astype(str).to_numpy(dtype=object)
+        logger.info(f"Found {len(hop_matches)} redirect chain matches")
+    
+    df.loc[:, 'is_stacker_link'] = pickup_rows >= 0
+    df.loc[:, 'matched_story'] = pickup_index.stories(pickup_rows)
+    df.loc[:, 'matched_via'] = matched_via
+    for name, codes in pickup_index.dimension_codes(pickup_rows).items():
+        df.loc[:, f'{name}_code'] = codes
+    
     # Keep only necessary columns in final output
     final_columns = [
         'Referring page URL',
         'Domain rating',
         'link_weight',
         'matched_story',
-        'is_stacker_link'
+        'matched_via',
+        'is_stacker_link',
+        'story_code',
+        'partner_code',
+        'publisher_code'
     ]
+    # Target URL is kept so matched links can be verified against the live page
+    if 'Target URL' in df.columns:
+        final_columns.insert(1, 'Target URL')
     
     result = df[final_columns].copy()
     logger.info("URL matching complete")
     return result
 
+def format_metrics(total, stacker_count, stacker_dr_mean, non_stacker_dr_mean,
+                   stacker_weight, non_stacker_weight, stacker_dr_sum) -> dict:
+    """Format link totals into the metrics saved with each report"""
+    return {
+        'Total Links': total,
+        'Stacker Links': stacker_count,
+        'Non-Stacker Links': total - stacker_count,
+        'Stacker Link Percentage': f"{(stacker_count / total * 100):.2f}%",
+        'Average Stacker DR': f"{stacker_dr_mean:.2f}",
+        'Average Non-Stacker DR': f"{non_stacker_dr_mean:.2f}",
+        'Stacker Link Weight Gain': int(stacker_weight),
+        'Non-Stacker Link Weight Gain': int(non_stacker_weight),
+        'Total Stacker DR': f"{stacker_dr_sum:.2f}"
+    }
+
 def calculate_metrics(df: pd.DataFrame) -> dict:
     """Calculate metrics for matched links"""
     logger.info("Calculating metrics...")
@@ -128,17 +297,23 @@ def calculate_metrics(df: pd.DataFrame) -> dict:
     stacker_links = df[stacker_mask].copy()
     non_stacker_links = df[~stacker_mask].copy()
     
-    metrics = {
-        'Total Links': len(df),
-        'Stacker Links': len(stacker_links),
-        'Non-Stacker Links': len(non_stacker_links),
-        'Stacker Link Percentage': f"{(len(stacker_links) / len(df) * 100):.2f}%",
-        'Average Stacker DR': f"{stacker_links['Domain rating'].mean():.2f}",
-        'Average Non-Stacker DR': f"{non_stacker_links['Domain rating'].mean():.2f}",
-        'Stacker Link Weight Gain': int(stacker_links['link_weight'].sum()),
-        'Non-Stacker Link Weight Gain': int(non_stacker_links['link_weight'].sum()),
-        'Total Stacker DR': f"{stacker_links['Domain rating'].sum():.2f}"
-    }
+    metrics = format_metrics(
+        len(df),
+        len(stacker_links),
+        stacker_links['Domain rating'].mean(),
+        non_stacker_links['Domain rating'].mean(),
+        stacker_links['link_weight'].sum(),
+        non_stacker_links['link_weight'].sum(),
+        stacker_links['Domain rating'].sum()
+    )
     
     logger.info("Metrics calculation complete")
-    return metrics
\ No newline at end of file
+    return metrics
+
+def calculate_dr_histograms(df: pd.DataFrame) -> dict:
+    """Stacker and non-Stacker link counts per Domain rating bin"""
+    stacker_mask = df['is_stacker_link']
+    return {
+        'Stacker DR Histogram': np.histogram(df.loc[stacker_mask, 'Domain rating'].dropna(), DR_BINS)[0].tolist(),
+        'Non-Stacker DR Histogram': np.histogram(df.loc[~stacker_mask, 'Domain rating'].dropna(), DR_BINS)[0].tolist()
+    }
\ No newline at end of file
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import logging
+import argparse
+import pandas as pd
+from main import URLProcessor
+from file_handler import file_signature, find_pickup_file, read_csv
+from utils import get_client_directory
+
+logger = logging.getLogger(__name__)
+
+PARTNER_INDEX_FILE = '.partner_index.json'
+PARTNER_COLUMNS = ['Publisher', 'Partner', 'Domain', 'URL']
+
+
+def extract_partner_domains(pickup_df):
+    """Map each cleaned partner domain in a pickup export to (publisher, partner)"""
+    domains = {}
+    publishers = pickup_df['Publisher'] if 'Publisher' in pickup_df.columns else pd.Series('', index=pickup_df.index)
+    partners = pickup_df['Partner'] if 'Partner' in pickup_df.columns else pd.Series('', index=pickup_df.index)
+    # Both the Domain column and the URL host count, since pickups can be served from either
+    for column in ('Domain', 'URL'):
+        if column not in pickup_df.columns:
+            continue
+        cleaned = URLProcessor.extract_domains(pickup_df[column].dropna())
+        for row, domain in cleaned.items():
+            if domain and domain not in domains:
+                domains[domain] = [
+                    '' if pd.isna(publishers[row]) else str(publishers[row]),
+                    '' if pd.isna(partners[row]) else str(partners[row])
+                ]
+    return domains
+
+
+class PartnerIndex:
+    """On-disk index of partner domains across every client's pickup export
+
+    Each client's entry is keyed by its pickup file signature, so update()
+    only re-reads exports that changed since the index was last saved.
+    """
+
+    def __init__(self, client_dir=None):
+        self.client_dir = client_dir or get_client_directory()
+        self.path = os.path.join(self.client_dir, PARTNER_INDEX_FILE)
+        self.clients = {}
+        self._domains = None
+
+    @classmethod
+    def load(cls, client_dir=None):
+        index = cls(client_dir)
+        if os.path.exists(index.path):
+            try:
+                with open(index.path) as f:
+                    index.clients = json.load(f).get('clients', {})
+            except Exception as e:
+                logger.error(f"Error reading partner index, rebuilding: {str(e)}")
+        return index
+
+    def save(self):
+        """Write the index atomically so concurrent readers never see a partial file"""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'clients': self.clients}, f)
+        os.replace(tmp_path, self.path)
+
+    def update_client(self, client):
+        """Refresh one client's entry if its pickup export changed, returns True if it did"""
+        client_path = os.path.join(self.client_dir, client)
+        signature = file_signature(find_pickup_file(client_path))
+        if signature is None:
+            return self.clients.pop(client, None) is not None
+
+        path, size, mtime_ns = signature
+        entry = self.clients.get(client)
+        if entry and entry['file'] == os.path.basename(path) and \
+                entry['size'] == size and entry['mtime_ns'] == mtime_ns:
+            return False
+
+        # Same reader as the analysis, so exports it can parse never fail here
+        pickup_df = read_csv(path, usecols=PARTNER_COLUMNS)
+        self.clients[client] = {
+            'file': os.path.basename(path),
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'domains': extract_partner_domains(pickup_df)
+        }
+        self._domains = None
+        logger.info(f"Indexed {len(self.clients[client]['domains'])} partner domains for {client}")
+        return True
+
+    def update(self):
+        """Incrementally refresh every client, dropping clients that no longer exist"""
+        clients = [d for d in os.listdir(self.client_dir)
+                   if os.path.isdir(os.path.join(self.client_dir, d)) and not d.startswith('.')]
+        changed = False
+        for client in set(self.clients) - set(clients):
+            del self.clients[client]
+            changed = True
+        for client in clients:
+            try:
+                changed = self.update_client(client) or changed
+            except Exception as e:
+                logger.error(f"Error indexing partner domains for {client}: {str(e)}")
+        if changed:
+            self._domains = None
+            self.save()
+        return changed
+
+    @property
+    def domains(self):
+        """Frozen set of every known partner domain for O(1) membership checks"""
+        if self._domains is None:
+            self._domains = frozenset(
+                domain for entry in self.clients.values() for domain in entry['domains']
+            )
+        return self._domains
+
+    def to_frame(self):
+        """One row per (domain, client) with publisher and partner"""
+        rows = [
+            (domain, publisher, partner, client)
+            for client, entry in self.clients.items()
+            for domain, (publisher, partner) in entry['domains'].items()
+        ]
+        return pd.DataFrame(rows, columns=['domain', 'publisher', 'partner', 'client'])
+
+    def partner_summary(self):
+        """Partner network size: domains, publishers and clients per partner"""
+        df = self.to_frame()
+        summary = df.groupby('partner').agg(
+            domains=('domain', 'nunique'),
+            publishers=('publisher', 'nunique'),
+            clients=('client', 'nunique')
+        )
+        return summary.sort_values('domains', ascending=False).reset_index()
+
+
+def get_partner_domains(client=None, client_dir=None):
+    """Load the partner index, refreshing the given client (or all), and return its domains
+
+    If the given client's entry cannot be refreshed, returns None so matching
+    runs unfiltered instead of dropping links on the client's own domains.
+    """
+    index = PartnerIndex.load(client_dir)
+    if client is None:
+        index.update()
+        return index.domains
+    try:
+        if index.update_client(client):
+            index.save()
+    except Exception as e:
+        # Its entry is missing or stale, so filtering could drop real matches
+        logger.error(f"Error indexing partner domains for {client}, matching without the partner filter: {str(e)}")
+        return None
+    return index.domains
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the cross-client partner domain index")
+    parser.add_argument('--rebuild', action='store_true', help="Ignore the saved index and re-read every export")
+    parser.add_argument('--output', help="Optional CSV path for the partner summary")
+    args = parser.parse_args()
+
+    index = PartnerIndex() if args.rebuild else PartnerIndex.load()
+    index.update()
+    print(f"{len(index.domains)} partner domains across {len(index.clients)} clients")
+
+    summary = index.partner_summary()
+    print(summary.to_string(index=False))
+    if args.output:
+        summary.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+
+import argparse
+import logging
+import time
+import pandas as pd
+from main import URLProcessor, PATH_LENGTH
+from file_handler import read_csv
+
+logger = logging.getLogger(__name__)
+
+MIN_PATH_LENGTH = 5
+MAX_PATH_LENGTH = 15
+LABEL_COLUMNS = ['label', 'is_stacker_label', 'is_stacker_link']
+TRUE_LABELS = {'true', '1', 'yes', 'y', 'stacker'}
+
+_END = ''  # Trie key marking the end of a full pickup path
+
+
+class PathTrie:
+    """Prefix trie of pickup paths per domain, where trie depth equals path length N"""
+
+    def __init__(self, max_depth):
+        self.max_depth = max_depth
+        self.roots = {}
+
+    def add(self, domain, path):
+        """Insert a cleaned pickup path, truncated to the deepest N evaluated"""
+        if not path:
+            return
+        node = self.roots.setdefault(domain, {})
+        for char in path[:self.max_depth]:
+            node = node.setdefault(char, {})
+        if len(path) <= self.max_depth:
+            node[_END] = True
+
+    def walk(self, domain, path):
+        """Return (matched depth, whether a full pickup path was consumed)"""
+        node = self.roots.get(domain)
+        if node is None or not path:
+            return 0, False
+        depth = 0
+        consumed = False
+        for char in path[:self.max_depth]:
+            node = node.get(char)
+            if node is None:
+                break
+            depth += 1
+            if _END in node:
+                consumed = True
+        return depth, consumed
+
+
+def build_path_trie(pickup_df, max_depth=MAX_PATH_LENGTH):
+    """Build a path trie from the pickup export URLs"""
+    trie = PathTrie(max_depth)
+    for url in pickup_df['URL'].dropna().unique():
+        try:
+            domain, path = URLProcessor.split_url(url)
+        except ValueError:
+            continue  # Malformed URLs, such as bad IPv6 hosts, cannot match anything
+        trie.add(domain, path)
+    return trie
+
+
+def parse_labels(series):
+    """Convert a human label column into booleans"""
+    if series.dtype == bool:
+        return series
+    return series.astype(str).str.strip().str.lower().isin(TRUE_LABELS)
+
+
+def find_label_column(df):
+    """Find the human label column in a labeled backlinks CSV"""
+    for column in LABEL_COLUMNS:
+        if column in df.columns:
+            return column
+    raise ValueError(f"Labeled data needs one of the columns: {', '.join(LABEL_COLUMNS)}")
+
+
+def evaluate_path_lengths(labeled_df, pickup_df, lengths=None, label_column=None):
+    """Score every candidate path length N against labeled data in a single pass
+
+    A backlink matches at length N when it shares the first N path characters
+    with a pickup URL on the same domain, or fully contains a pickup path
+    shorter than N - the same rule match_urls applies with PATH_LENGTH = N.
+    """
+    if lengths is None:
+        lengths = range(MIN_PATH_LENGTH, MAX_PATH_LENGTH + 1)
+    lengths = sorted(set(lengths))
+    if label_column is None:
+        label_column = find_label_column(labeled_df)
+    labels = parse_labels(labeled_df[label_column]).to_numpy()
+
+    start = time.perf_counter()
+    trie = build_path_trie(pickup_df, max_depth=max(lengths))
+
+    # Normalize each distinct backlink once and walk it down the trie
+    urls = labeled_df['Referring page URL'].astype(str)
+    walks = {}
+    for url in urls.unique():
+        try:
+            domain, path = URLProcessor.split_url(url)
+        except ValueError:
+            walks[url] = (0, False)  # Counted as unmatched, as in match_urls
+            continue
+        walks[url] = trie.walk(domain, path)
+    walked = urls.map(walks)
+    depths = walked.str[0].to_numpy()
+    consumed = walked.str[1].to_numpy(dtype=bool)
+    index_seconds = time.perf_counter() - start
+    logger.info(f"Indexed {len(urls)} backlinks in {index_seconds:.3f}s")
+
+    rows = []
+    for n in lengths:
+        n_start = time.perf_counter()
+        predicted = (depths >= n) | consumed
+        true_pos = int((predicted & labels).sum())
+        false_pos = int((predicted & ~labels).sum())
+        false_neg = int((~predicted & labels).sum())
+        precision = true_pos / (true_pos + false_pos) if true_pos + false_pos else 0.0
+        recall = true_pos / (true_pos + false_neg) if true_pos + false_neg else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        rows.append({
+            'path_length': n,
+            'true_positives': true_pos,
+            'false_positives': false_pos,
+            'false_negatives': false_neg,
+            'precision': round(precision, 4),
+            'recall': round(recall, 4),
+            'f1': round(f1, 4),
+            'seconds': round(time.perf_counter() - n_start, 6)
+        })
+
+    results = pd.DataFrame(rows)
+    results.attrs['index_seconds'] = index_seconds
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score candidate path lengths against labeled backlinks")
+    parser.add_argument('labeled_csv', help="Backlinks CSV with 'Referring page URL' and a human label column")
+    parser.add_argument('pickup_csv', help="Pickup export for the same client")
+    parser.add_argument('--min', type=int, default=MIN_PATH_LENGTH, dest='min_length')
+    parser.add_argument('--max', type=int, default=MAX_PATH_LENGTH, dest='max_length')
+    parser.add_argument('--label-column', default=None)
+    parser.add_argument('--output', help="Optional CSV path for the results table")
+    args = parser.parse_args()
+
+    labeled_df = read_csv(args.labeled_csv)
+    pickup_df = read_csv(args.pickup_csv)
+    results = evaluate_path_lengths(
+        labeled_df,
+        pickup_df,
+        lengths=range(args.min_length, args.max_length + 1),
+        label_column=args.label_column
+    )
+
+    print(results.to_string(index=False))
+    best = results.loc[results['f1'].idxmax()]
+    print(f"\nBest path length: {int(best['path_length'])} (F1 {best['f1']:.4f}), "
+          f"current PATH_LENGTH = {PATH_LENGTH}")
+    print(f"Shared index time: {results.attrs['index_seconds']:.3f}s")
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
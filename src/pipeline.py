@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+import os
+import logging
+import pandas as pd
+from main import PickupIndex, match_urls, calculate_metrics, calculate_dr_histograms
+from file_handler import (
+    load_client_files,
+    find_ahrefs_file,
+    find_pickup_file,
+    files_match_latest,
+    get_latest_report,
+    write_report_summary
+)
+from url_templates import get_template_matcher
+from partner_index import get_partner_domains
+from rollups import group_aggregates, save_rollups
+from acquisition import acquisition_curves, save_acquisition
+from report_writer import ReportWriter
+from alerts import update_client_alerts
+from utils import get_client_directory
+
+logger = logging.getLogger(__name__)
+
+def analyze_client(client, client_dir=None, use_store=False):
+    """Run the analysis pipeline for one client and save a timestamped report
+
+    If the client's files match the latest report, that report is reused.
+    Returns the matched DataFrame and the report directory it came from.
+    With use_store the analysis runs out of core in the client's SQLite
+    store (see client_store), and no DataFrame is returned for new reports.
+    """
+    if client_dir is None:
+        client_dir = get_client_directory()
+    client_path = os.path.join(client_dir, client)
+
+    # Check if files match latest report
+    current_files = {
+        'ahrefs': find_ahrefs_file(client_path),
+        'pickup': find_pickup_file(client_path)
+    }
+
+    if all(current_files.values()) and files_match_latest(client_path, current_files):
+        # Use latest report instead of reprocessing
+        latest_path, _ = get_latest_report(client_path)
+        matched_df = pd.read_csv(os.path.join(latest_path, 'backlinks_analysis.csv'))
+        logger.info(f"Using existing report from {os.path.basename(latest_path)}")
+        return matched_df, latest_path
+
+    if use_store:
+        return None, analyze_client_store(client, client_dir, current_files)
+
+    # Load and process data
+    ahrefs_df, pickup_df = load_client_files(client_dir, client)
+    if ahrefs_df is None or pickup_df is None:
+        raise Exception("Failed to load client files")
+
+    logger.info("Processing new data...")
+    pickup_index = PickupIndex(pickup_df)
+    matched_df = match_urls(
+        ahrefs_df,
+        pickup_df,
+        get_template_matcher(),
+        pickup_index=pickup_index,
+        partner_domains=get_partner_domains(client, client_dir)
+    )
+    logger.info("URL matching complete")
+    metrics = calculate_metrics(matched_df)
+    logger.info("Metrics calculation complete")
+
+    # Write the report files in parallel and publish them together
+    with ReportWriter(client_path) as report:
+        report.submit(save_results, matched_df)
+        save_report_files(
+            report,
+            metrics,
+            calculate_dr_histograms(matched_df),
+            group_aggregates(matched_df, pickup_index),
+            acquisition_curves(ahrefs_df, matched_df['is_stacker_link'].to_numpy()),
+            current_files
+        )
+    report_dir = report.report_dir
+    logger.info(f"Saved report for {client} to {report_dir}")
+    check_alerts(client_path, report_dir)
+    return matched_df, report_dir
+
+def analyze_client_store(client, client_dir, current_files):
+    """Match and summarize a client in its SQLite store, streaming the report out"""
+    from client_store import ClientStore
+
+    if not all(current_files.values()):
+        raise Exception("Failed to load client files")
+
+    with ClientStore.for_client(client, client_dir) as store:
+        store.load(current_files['ahrefs'], current_files['pickup'])
+        store.match(get_template_matcher(), get_partner_domains(client, client_dir))
+        metrics = store.metrics()
+
+        with ReportWriter(os.path.join(client_dir, client)) as report:
+            save_report_files(report, metrics, store.dr_histograms(), store.group_aggregates(),
+                              store.acquisition_curves(), current_files)
+            # The store's connection belongs to this thread, so the export runs here alongside the pool
+            store.export_matched(report.path('backlinks_analysis.csv'))
+        report_dir = report.report_dir
+        store.save_snapshot(os.path.basename(report_dir), metrics,
+                            current_files['ahrefs'], current_files['pickup'])
+
+    logger.info(f"Saved report for {client} to {report_dir}")
+    check_alerts(os.path.join(client_dir, client), report_dir)
+    return report_dir
+
+def check_alerts(client_path, report_dir):
+    """Update the client's rolling report statistics, never failing the analysis"""
+    try:
+        update_client_alerts(client_path, report_dir)
+    except Exception as e:
+        logger.error(f"Error updating alerts for {report_dir}: {str(e)}")
+
+def save_results(report_path, matched_df):
+    matched_df.to_csv(os.path.join(report_path, 'backlinks_analysis.csv'), index=False)
+
+def save_metrics(report_path, metrics, histograms):
+    with open(os.path.join(report_path, 'metrics.txt'), 'w') as f:
+        for metric, value in metrics.items():
+            f.write(f"{metric}: {value}\n")
+    write_report_summary(report_path, metrics, histograms)
+
+def save_report_files(report, metrics, histograms, rollup_base, curves, current_files):
+    """Queue metrics, summary, rollups, acquisition curves and copies of the input files on a ReportWriter"""
+    report.submit(save_metrics, metrics, histograms)
+
+    # Save story, partner and publisher group aggregates
+    report.submit(lambda report_path: save_rollups(rollup_base, report_path))
+    if curves is not None:
+        report.submit(lambda report_path: save_acquisition(curves, report_path))
+
+    report.add_inputs(current_files)
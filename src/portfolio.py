@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from file_handler import list_report_dirs, read_report_summary
+from utils import get_client_directory
+
+logger = logging.getLogger(__name__)
+
+PORTFOLIO_CACHE_FILE = '.portfolio_cache.json'
+DEFAULT_WORKERS = 16
+
+PORTFOLIO_COLUMNS = [
+    'Total Links',
+    'Stacker Links',
+    'Stacker Link Percentage',
+    'Average Stacker DR',
+    'Average Non-Stacker DR',
+    'Stacker Link Weight Gain',
+    'Non-Stacker Link Weight Gain'
+]
+
+
+def reports_signature(client_path):
+    """mtime of the reports directory, which changes whenever a report is added or removed"""
+    try:
+        return os.stat(os.path.join(client_path, 'reports')).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def load_client_summary(client_path):
+    """Latest report name and summary record for one client"""
+    reports = list_report_dirs(client_path)
+    if not reports:
+        return None, {}
+    return reports[-1], read_report_summary(os.path.join(client_path, 'reports', reports[-1]))
+
+
+class Portfolio:
+    """Latest report summaries for every client, cached on disk between runs"""
+
+    def __init__(self, client_dir=None, workers=DEFAULT_WORKERS):
+        self.client_dir = client_dir or get_client_directory()
+        self.cache_path = os.path.join(self.client_dir, PORTFOLIO_CACHE_FILE)
+        self.workers = workers
+        self.entries = {}
+        if os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path) as f:
+                    self.entries = json.load(f)
+            except Exception as e:
+                logger.error(f"Error reading portfolio cache: {str(e)}")
+
+    def refresh(self):
+        """Re-read summaries only for clients whose reports changed, in parallel"""
+        clients = [d for d in os.listdir(self.client_dir)
+                   if os.path.isdir(os.path.join(self.client_dir, d)) and not d.startswith('.')]
+        signatures = {client: reports_signature(os.path.join(self.client_dir, client)) for client in clients}
+        stale = [client for client in clients
+                 if client not in self.entries or self.entries[client]['signature'] != signatures[client]]
+        removed = set(self.entries) - set(clients)
+
+        def load(client):
+            try:
+                return client, load_client_summary(os.path.join(self.client_dir, client))
+            except Exception as e:
+                logger.error(f"Error reading reports for {client}: {str(e)}")
+                return client, (None, {})
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for client, (report, summary) in executor.map(load, stale):
+                    self.entries[client] = {
+                        'signature': signatures[client],
+                        'report': report,
+                        'metrics': summary
+                    }
+        for client in removed:
+            del self.entries[client]
+
+        if stale or removed:
+            self.save()
+        logger.info(f"Portfolio: {len(clients)} clients, {len(stale)} refreshed")
+        return self
+
+    def save(self):
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def to_frame(self):
+        """One row per client with its latest report and metrics"""
+        rows = []
+        for client, entry in sorted(self.entries.items()):
+            row = {'Client': client, 'Report': entry['report']}
+            row.update({name: entry['metrics'].get(name) for name in PORTFOLIO_COLUMNS})
+            rows.append(row)
+        return pd.DataFrame(rows, columns=['Client', 'Report'] + PORTFOLIO_COLUMNS)
+
+
+def load_portfolio(client_dir=None, workers=DEFAULT_WORKERS):
+    """Refresh and return the portfolio table"""
+    return Portfolio(client_dir, workers).refresh().to_frame()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latest metrics for every client")
+    parser.add_argument('--sort', default='Stacker Link Percentage', help="Column to sort by")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--output', help="Optional CSV path for the portfolio table")
+    args = parser.parse_args()
+
+    portfolio = load_portfolio(workers=args.workers)
+    if args.sort in portfolio.columns:
+        portfolio = portfolio.sort_values(args.sort, ascending=False)
+    print(portfolio.to_string(index=False))
+    if args.output:
+        portfolio.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import time
+import shutil
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from file_handler import REPORT_COMPLETE_FILE, STAGING_PREFIX, calculate_file_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4  # Report files are written to disk, so a few threads are enough
+STALE_STAGING_SECONDS = 24 * 60 * 60  # Staging directories older than this were left by crashed runs
+
+
+def copy_input(report_path, file_path):
+    """Copy an input file into a report, returning its name and hash"""
+    copied = shutil.copy2(file_path, report_path)
+    return os.path.basename(copied), calculate_file_hash(copied)
+
+
+def clean_stale_staging(reports_dir, max_age=STALE_STAGING_SECONDS):
+    """Remove staging directories left behind by runs that never finished"""
+    cutoff = time.time() - max_age
+    for name in os.listdir(reports_dir):
+        path = os.path.join(reports_dir, name)
+        if name.startswith(STAGING_PREFIX) and os.path.getmtime(path) < cutoff:
+            logger.warning(f"Removing stale report staging directory {path}")
+            shutil.rmtree(path, ignore_errors=True)
+
+
+class ReportWriter:
+    """Writes a report's files in parallel into a staging directory and publishes them at once
+
+    The staging directory is hidden inside reports/ and ignored by readers.
+    When every file has been written a completion marker recording the
+    input hashes is added, and the directory is renamed to its timestamp in
+    one atomic step. A failed run removes its staging directory, so a report
+    is either complete or absent.
+    """
+
+    def __init__(self, client_path, workers=DEFAULT_WORKERS):
+        self.reports_dir = os.path.join(client_path, 'reports')
+        self.timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.staging_path = os.path.join(self.reports_dir, f"{STAGING_PREFIX}{self.timestamp}_{os.getpid()}")
+        self.workers = workers
+        self.report_dir = None
+        self._futures = []
+        self._inputs = []
+
+    def __enter__(self):
+        os.makedirs(self.reports_dir, exist_ok=True)
+        clean_stale_staging(self.reports_dir)
+        os.makedirs(self.staging_path)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        return self
+
+    def path(self, name):
+        """Path of a file in the staging directory"""
+        return os.path.join(self.staging_path, name)
+
+    def submit(self, function, *args):
+        """Run function(staging path, *args) in the writer's thread pool"""
+        future = self._executor.submit(function, self.staging_path, *args)
+        self._futures.append(future)
+        return future
+
+    def add_inputs(self, current_files):
+        """Copy the input files into the report, recording their hashes in the marker"""
+        for file_path in current_files.values():
+            if file_path:
+                self._inputs.append(self.submit(copy_input, file_path))
+
+    def __exit__(self, exc_type, exc, tb):
+        self._executor.shutdown(wait=True)
+        try:
+            if exc_type is None:
+                # Surface the first failed write
+                for future in self._futures:
+                    future.result()
+                self._publish()
+        except BaseException:
+            shutil.rmtree(self.staging_path, ignore_errors=True)
+            raise
+        if exc_type is not None:
+            shutil.rmtree(self.staging_path, ignore_errors=True)
+        return False
+
+    def _publish(self):
+        marker = {
+            'completed': datetime.now().isoformat(timespec='seconds'),
+            'inputs': dict(future.result() for future in self._inputs),
+            'files': sorted(os.listdir(self.staging_path))
+        }
+        with open(self.path(REPORT_COMPLETE_FILE), 'w') as f:
+            json.dump(marker, f)
+
+        # Renaming onto an existing report fails, so runs in the same second take a suffix
+        name, suffix = self.timestamp, 0
+        while True:
+            report_dir = os.path.join(self.reports_dir, name)
+            try:
+                os.rename(self.staging_path, report_dir)
+                break
+            except OSError:
+                if not os.path.exists(report_dir):
+                    raise
+                suffix += 1
+                name = f"{self.timestamp}_{suffix}"
+        self.report_dir = report_dir
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+import os
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_FILE = 'rollups.csv'
+CODE_COLUMNS = ['story_code', 'partner_code', 'publisher_code']
+
+# Label columns each rollup groups by
+ROLLUP_DIMENSIONS = {
+    'Story': ['Story ID', 'Story Name'],
+    'Partner': ['Partner'],
+    'Publisher': ['Publisher']
+}
+
+
+def _labels(labels, codes):
+    """Look up labels for codes, '' for -1"""
+    return np.append(labels, '')[np.where(codes >= 0, codes, len(labels))]
+
+
+def group_aggregates(matched_df: pd.DataFrame, pickup_index) -> pd.DataFrame:
+    """Aggregate Stacker links once by (story, partner, publisher) code
+
+    Every rollup is a re-aggregation of this small table, so it is the only
+    pass over the matched rows and the only table saved with the report.
+    """
+    stacker_links = matched_df[matched_df['is_stacker_link']]
+    base = stacker_links.groupby(CODE_COLUMNS, sort=False).agg(
+        links=('Domain rating', 'size'),
+        dr_sum=('Domain rating', 'sum'),
+        weight_sum=('link_weight', 'sum')
+    ).reset_index()
+    return add_labels(base, pickup_index.labels, pickup_index.story_names)
+
+
+def add_labels(base: pd.DataFrame, labels, story_names) -> pd.DataFrame:
+    """Insert the label columns for each code column of the group aggregates"""
+    story_codes = base['story_code'].to_numpy()
+    base.insert(3, 'Story ID', _labels(labels['story'], story_codes))
+    base.insert(4, 'Story Name', _labels(story_names, story_codes))
+    base.insert(5, 'Partner', _labels(labels['partner'], base['partner_code'].to_numpy()))
+    base.insert(6, 'Publisher', _labels(labels['publisher'], base['publisher_code'].to_numpy()))
+    return base
+
+
+def rollup(base: pd.DataFrame, dimension) -> pd.DataFrame:
+    """Per-story, per-partner or per-publisher totals from the group aggregates"""
+    columns = ROLLUP_DIMENSIONS[dimension]
+    totals = base.groupby(columns, sort=False, dropna=False).agg(
+        links=('links', 'sum'),
+        dr_sum=('dr_sum', 'sum'),
+        weight_sum=('weight_sum', 'sum')
+    ).reset_index()
+    totals['dr_mean'] = totals['dr_sum'] / totals['links']
+    totals = totals.sort_values('weight_sum', ascending=False)
+    return totals[columns + ['links', 'dr_mean', 'weight_sum']].rename(columns={
+        'links': 'Links',
+        'dr_mean': 'Average DR',
+        'weight_sum': 'Link Weight'
+    })
+
+
+def save_rollups(base: pd.DataFrame, report_path):
+    base.to_csv(os.path.join(report_path, ROLLUP_FILE), index=False)
+
+
+def load_rollups(report_path):
+    """Load a report's group aggregates, None for reports saved before rollups existed"""
+    path = os.path.join(report_path, ROLLUP_FILE)
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path, keep_default_na=False, dtype={'Story ID': str})
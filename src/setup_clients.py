@@ -3,19 +3,21 @@
 import os
 import shutil
 import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from file_handler import calculate_file_hash
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Source and destination paths
-SRC_DIR = r"C:\Users\merman\Desktop\stacker-chisel-desktop\stacker-chisel\clients"
-DEST_DIR = r"C:\Users\merman\Desktop\Stacker\DofollowBacklinks\clients"
+DEFAULT_WORKERS = 8
+SKIP_DIRS = {'.ipynb_checkpoints', 'multi', 'testclient', 'test_results'}
 
-def should_process_directory(name):
+def should_process_directory(src_dir, name):
     """Filter out non-client directories"""
-    skip_dirs = {'.ipynb_checkpoints', 'multi', 'testclient', 'test_results'}
-    return os.path.isdir(os.path.join(SRC_DIR, name)) and name not in skip_dirs and not name.endswith('.ipynb')
+    return (os.path.isdir(os.path.join(src_dir, name)) and name not in SKIP_DIRS
+            and not name.endswith('.ipynb') and not name.startswith('.'))
 
 def should_copy_file(filename):
     """Check if file should be copied"""
@@ -23,38 +25,122 @@ def should_copy_file(filename):
         return False
     if 'Backlink Overlap Analysis' in filename and filename.endswith('Ahrefs.csv'):
         return True
-    if filename.startswith('custom_pickup_export_'):
+    if filename.startswith('custom_pickup_export_') and filename.endswith('.csv'):
         return True
     return False
 
-def main():
-    # Get list of client directories
-    client_dirs = [d for d in os.listdir(SRC_DIR) if should_process_directory(d)]
+def plan_file(src_file, dest_file, use_hash=False):
+    """Decide what to do with one file: 'new', 'changed', 'touched' or 'unchanged'"""
+    try:
+        dest_stat = os.stat(dest_file)
+    except FileNotFoundError:
+        return 'new'
+    src_stat = os.stat(src_file)
+    if src_stat.st_size != dest_stat.st_size:
+        return 'changed'
+    if src_stat.st_mtime_ns == dest_stat.st_mtime_ns or \
+            (src_stat.st_ino == dest_stat.st_ino and src_stat.st_dev == dest_stat.st_dev):
+        return 'unchanged'
+    if use_hash and calculate_file_hash(src_file) == calculate_file_hash(dest_file):
+        # Same content with a different mtime, only the timestamp needs syncing
+        return 'touched'
+    return 'changed'
+
+def sync_file(src_file, dest_file, action, link=False):
+    """Copy or hardlink one file, replacing the destination atomically"""
+    if action == 'touched':
+        src_stat = os.stat(src_file)
+        os.utime(dest_file, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        return
+
+    # Hidden, and without the .csv suffix, so the export finders never pick up a partial copy
+    tmp_file = os.path.join(os.path.dirname(dest_file), f".{os.path.basename(dest_file)}.sync-tmp")
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+    if link:
+        try:
+            os.link(src_file, tmp_file)
+        except OSError:
+            shutil.copy2(src_file, tmp_file)
+    else:
+        shutil.copy2(src_file, tmp_file)
+    os.replace(tmp_file, dest_file)
+
+def same_filesystem(src_dir, dest_dir):
+    """True if hardlinks between the two trees are possible"""
+    os.makedirs(dest_dir, exist_ok=True)
+    return os.stat(src_dir).st_dev == os.stat(dest_dir).st_dev
+
+def plan_sync(src_dir, dest_dir, use_hash=False, workers=DEFAULT_WORKERS):
+    """List (client, src file, dest file, action) for every export in the source tree"""
+    client_dirs = [d for d in os.listdir(src_dir) if should_process_directory(src_dir, d)]
     logger.info(f"Found {len(client_dirs)} client directories to process")
-    
+
+    candidates = []
     for client in client_dirs:
-        src_client_dir = os.path.join(SRC_DIR, client)
-        dest_client_dir = os.path.join(DEST_DIR, client)
-        
-        # Create client directory
-        os.makedirs(dest_client_dir, exist_ok=True)
-        
-        # Find and copy relevant files
-        files_copied = 0
-        for file in os.listdir(src_client_dir):
-            if should_copy_file(file):
-                src_file = os.path.join(src_client_dir, file)
-                dest_file = os.path.join(dest_client_dir, file)
-                shutil.copy2(src_file, dest_file)
-                files_copied += 1
-                logger.info(f"Copied {file} to {dest_client_dir}")
-        
-        if files_copied == 0:
+        files = [f for f in os.listdir(os.path.join(src_dir, client)) if should_copy_file(f)]
+        if len(files) == 0:
             logger.warning(f"No relevant files found for {client}")
-        elif files_copied == 1:
+        elif len(files) == 1:
             logger.warning(f"Only found one file for {client}, might be missing data")
-        else:
-            logger.info(f"Successfully copied {files_copied} files for {client}")
+        for file in files:
+            candidates.append((client, os.path.join(src_dir, client, file),
+                               os.path.join(dest_dir, client, file)))
+
+    # Stats and hashes are I/O bound, so check files in parallel
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        actions = executor.map(lambda c: plan_file(c[1], c[2], use_hash), candidates)
+        return [candidate + (action,) for candidate, action in zip(candidates, actions)]
+
+def sync_clients(src_dir, dest_dir, use_hash=False, link=True, dry_run=False, workers=DEFAULT_WORKERS):
+    """Copy new or changed client exports from src_dir to dest_dir, returning action counts"""
+    plan = plan_sync(src_dir, dest_dir, use_hash, workers)
+    counts = {'new': 0, 'changed': 0, 'touched': 0, 'unchanged': 0}
+    transfer_bytes = 0
+    for client, src_file, dest_file, action in plan:
+        counts[action] += 1
+        if action in ('new', 'changed'):
+            transfer_bytes += os.path.getsize(src_file)
+            logger.info(f"{'Would sync' if dry_run else 'Syncing'} {action} {client}/{os.path.basename(src_file)}")
+
+    summary = (f"{counts['new']} new, {counts['changed']} changed, {counts['touched']} touched, "
+               f"{counts['unchanged']} unchanged ({transfer_bytes / 1e6:,.1f} MB to transfer)")
+    if dry_run:
+        logger.info(f"Dry run: {summary}")
+        return counts
+
+    link = link and same_filesystem(src_dir, dest_dir)
+    pending = [(src_file, dest_file, action) for _, src_file, dest_file, action in plan
+               if action != 'unchanged']
+    for dest_client_dir in {os.path.dirname(dest_file) for _, dest_file, _ in pending}:
+        os.makedirs(dest_client_dir, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda p: sync_file(*p, link=link), pending))
+
+    logger.info(f"Synced {'with hardlinks' if link else 'with copies'}: {summary}")
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync client export files between client directories")
+    parser.add_argument('src_dir', help="Source clients directory")
+    parser.add_argument('dest_dir', help="Destination clients directory")
+    parser.add_argument('--hash', action='store_true',
+                        help="Hash same-size files with different mtimes instead of recopying them")
+    parser.add_argument('--no-link', action='store_true',
+                        help="Always copy, even when both trees are on the same filesystem")
+    parser.add_argument('--dry-run', action='store_true', help="Only report what would be synced")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    sync_clients(
+        args.src_dir,
+        args.dest_dir,
+        use_hash=args.hash,
+        link=not args.no_link,
+        dry_run=args.dry_run,
+        workers=args.workers
+    )
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+
+import numbers
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+import numpy as np
+import pandas as pd
+
+
+def format_cell(value):
+    """Display format for a table cell"""
+    if isinstance(value, (bool, np.bool_)):
+        return str(value)
+    if isinstance(value, numbers.Integral):
+        return f"{value:,d}"
+    if isinstance(value, numbers.Real):
+        return '' if pd.isna(value) else f"{value:,.2f}"
+    if value is None or value is pd.NA:
+        return ''
+    return str(value)
+
+
+class SortableTable:
+    """Treeview showing a small DataFrame, sorted by clicking a column heading"""
+
+    def __init__(self, parent, height=15):
+        self.frame = ttk.Frame(parent)
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.rowconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(self.frame, show='headings', height=height)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        scrollbar = ttk.Scrollbar(self.frame, orient=VERTICAL, command=self.tree.yview)
+        scrollbar.grid(row=0, column=1, sticky="ns")
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        self.df = pd.DataFrame()
+        self.sort_column = None
+        self.sort_ascending = True
+
+    def set_data(self, df: pd.DataFrame):
+        """Replace the table contents"""
+        self.df = df.reset_index(drop=True)
+        self.tree['columns'] = list(self.df.columns)
+        for column in self.df.columns:
+            self.tree.heading(column, text=column, command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=120, anchor=W)
+        self.refresh()
+
+    def sort_by(self, column):
+        """Sort by a column, toggling direction on repeated clicks"""
+        if self.sort_column == column:
+            self.sort_ascending = not self.sort_ascending
+        else:
+            self.sort_column = column
+            self.sort_ascending = True
+        self.df = self.df.sort_values(column, ascending=self.sort_ascending, kind='mergesort',
+                                      na_position='last').reset_index(drop=True)
+        self.refresh()
+
+    def refresh(self):
+        self.tree.delete(*self.tree.get_children())
+        for row in self.df.itertuples(index=False):
+            self.tree.insert('', END, values=[format_cell(value) for value in row])
+
+
+class ResultsView:
+    """Filter and sort state over a large results frame
+
+    Domain and story columns are factorized once so text filters only scan
+    the distinct values, and each column's sort order is computed once and
+    reused. The current view is an array of row positions.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        from main import URLProcessor
+
+        # Integer code columns are for rollups, not for display
+        self.df = df[[c for c in df.columns if not c.endswith('_code')]].reset_index(drop=True)
+        self.domain_codes, self.domains = pd.factorize(
+            URLProcessor.extract_domains(self.df['Referring page URL']))
+        self.story_codes, self.stories = pd.factorize(self.df['matched_story'].fillna(''))
+        self.domain_rating = self.df['Domain rating'].to_numpy(dtype=float)
+        self.is_stacker = self.df['is_stacker_link'].to_numpy(dtype=bool)
+        self.sort_orders = {}
+
+        self.mask = np.ones(len(self.df), dtype=bool)
+        self.sort_column = None
+        self.sort_ascending = True
+        self.rows = np.arange(len(self.df))
+
+    def _code_mask(self, codes, uniques, text):
+        """Rows whose factorized value contains text, checked once per distinct value"""
+        matching = np.flatnonzero(pd.Series(uniques).str.contains(text.lower(), case=False, regex=False))
+        return np.isin(codes, matching)
+
+    def filter(self, story='', domain='', dr_min=None, dr_max=None, stacker=None):
+        """Set filters; stacker is True, False or None for all links"""
+        mask = np.ones(len(self.df), dtype=bool)
+        if story:
+            mask &= self._code_mask(self.story_codes, self.stories, story)
+        if domain:
+            mask &= self._code_mask(self.domain_codes, self.domains, domain)
+        if dr_min is not None:
+            mask &= self.domain_rating >= dr_min
+        if dr_max is not None:
+            mask &= self.domain_rating <= dr_max
+        if stacker is not None:
+            mask &= self.is_stacker == stacker
+        self.mask = mask
+        self._update_rows()
+
+    def sort(self, column, ascending=True):
+        self.sort_column = column
+        self.sort_ascending = ascending
+        self._update_rows()
+
+    def _sort_order(self, column):
+        if column not in self.sort_orders:
+            ordered = self.df[column].sort_values(kind='stable', na_position='last')
+            self.sort_orders[column] = ordered.index.to_numpy()
+        return self.sort_orders[column]
+
+    def _update_rows(self):
+        if self.sort_column is None:
+            self.rows = np.flatnonzero(self.mask)
+            return
+        order = self._sort_order(self.sort_column)
+        if not self.sort_ascending:
+            order = order[::-1]
+        self.rows = order[self.mask[order]]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def page(self, start, count):
+        """DataFrame rows for one window of the current view"""
+        return self.df.iloc[self.rows[start:start + count]]
+
+
+class VirtualTable:
+    """Treeview that only renders the rows currently scrolled into view"""
+
+    def __init__(self, parent, row_height=22):
+        self.frame = ttk.Frame(parent)
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.rowconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(self.frame, show='headings', selectmode='browse')
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=VERTICAL, command=self.on_scroll)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.row_height = row_height
+        self.visible_rows = 20
+        self.offset = 0
+        self.view = None
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<MouseWheel>', lambda e: self.scroll_by(-1 if e.delta > 0 else 1, 'units'))
+        self.tree.bind('<Button-4>', lambda e: self.scroll_by(-1, 'units'))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_by(1, 'units'))
+
+    def set_view(self, view: ResultsView):
+        """Show a ResultsView, one column per results column"""
+        self.view = view
+        self.tree['columns'] = list(view.df.columns)
+        for column in view.df.columns:
+            self.tree.heading(column, text=column, command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=300 if column in ('Referring page URL', 'Target URL', 'matched_story') else 110,
+                             anchor=W)
+        self.offset = 0
+        self.render()
+
+    def sort_by(self, column):
+        """Sort by a column, toggling direction on repeated clicks"""
+        ascending = not (self.view.sort_column == column and self.view.sort_ascending)
+        self.view.sort(column, ascending)
+        self.offset = 0
+        self.render()
+
+    def on_resize(self, event):
+        rows = max(1, event.height // self.row_height - 1)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.render()
+
+    def on_scroll(self, action, amount, unit=None):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')"""
+        if self.view is None:
+            return
+        if action == 'moveto':
+            self.offset = int(float(amount) * len(self.view))
+            self.render()
+        else:
+            self.scroll_by(int(amount), unit)
+
+    def scroll_by(self, amount, unit):
+        if self.view is None:
+            return
+        step = self.visible_rows if unit == 'pages' else 3
+        self.offset += amount * step
+        self.render()
+
+    def render(self):
+        """Fill the fixed set of Treeview rows from the current window of the view"""
+        if self.view is None:
+            return
+        total = len(self.view)
+        self.offset = max(0, min(self.offset, total - self.visible_rows))
+        page = self.view.page(self.offset, self.visible_rows)
+
+        items = self.tree.get_children()
+        if len(items) > len(page):
+            self.tree.delete(*items[len(page):])
+            items = items[:len(page)]
+        values = [[format_cell(value) for value in row] for row in page.itertuples(index=False)]
+        for item, row_values in zip(items, values):
+            self.tree.item(item, values=row_values)
+        for row_values in values[len(items):]:
+            self.tree.insert('', END, values=row_values)
+
+        if total:
+            self.scrollbar.set(self.offset / total, (self.offset + len(page)) / total)
+        else:
+            self.scrollbar.set(0, 1)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import json
+import logging
+import pandas as pd
+from main import URLProcessor
+from utils import get_project_root
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_LIBRARY_FILE = 'url_templates.json'
+
+# Built-in partner URL templates, extended by url_templates.json in the project root
+DEFAULT_TEMPLATES = [
+    {'partner': 'Creative Circle Media Solutions', 'template': '/premium/stacker/stories/<slug>,<id>'},
+]
+
+# Regex used for each placeholder name, anything else matches one path segment
+PLACEHOLDER_PATTERNS = {
+    'id': r'\d+',
+    'slug': r'[^/,]+',
+}
+DEFAULT_PLACEHOLDER_PATTERN = r'[^/]+'
+
+_PLACEHOLDER = re.compile(r'<(\w+)>')
+
+
+def compile_template(template, prefix):
+    """Translate a URL template into a regex with group names under prefix"""
+    parts = []
+    position = 0
+    for placeholder in _PLACEHOLDER.finditer(template.lower()):
+        parts.append(re.escape(template.lower()[position:placeholder.start()]))
+        name = placeholder.group(1)
+        pattern = PLACEHOLDER_PATTERNS.get(name, DEFAULT_PLACEHOLDER_PATTERN)
+        parts.append(f"(?P<{prefix}_{name}>{pattern})")
+        position = placeholder.end()
+    parts.append(re.escape(template.lower()[position:].rstrip('/')))
+    return ''.join(parts)
+
+
+class TemplateMatcher:
+    """All partner URL templates compiled into one combined regex"""
+
+    def __init__(self, templates):
+        self.templates = list(templates)
+        self.fields = []
+        alternatives = []
+        for i, entry in enumerate(self.templates):
+            alternatives.append(f"(?P<t{i}>{compile_template(entry['template'], f't{i}')})")
+            self.fields.append(_PLACEHOLDER.findall(entry['template'].lower()))
+        # One anchored alternation so each path is scanned once, however many templates exist
+        self.pattern = re.compile(f"^(?:{'|'.join(alternatives)})(?=/|$)") if alternatives else None
+
+    def extract(self, path):
+        """Return (template index, placeholder values) for a cleaned path, or None"""
+        if self.pattern is None:
+            return None
+        match = self.pattern.match(path)
+        if match is None:
+            return None
+        # The outer template group closes last, so lastgroup names the matched template
+        index = int(match.lastgroup[1:])
+        values = {name: match.group(f't{index}_{name}') for name in self.fields[index]}
+        return index, values
+
+    def url_key(self, url):
+        """Join key for a URL: domain, template and its id (or all placeholder values)"""
+        try:
+            domain, path = URLProcessor.split_url(url)
+        except Exception:
+            return None
+        extracted = self.extract(path)
+        if extracted is None:
+            return None
+        index, values = extracted
+        if 'id' in values:
+            return domain, index, values['id']
+        return (domain, index) + tuple(values[name] for name in self.fields[index])
+
+    def index_pickups(self, pickup_urls: pd.Series) -> dict:
+        """Map each pickup template key to its first pickup row position"""
+        pickup_keys = {}
+        for row, url in enumerate(pickup_urls):
+            if isinstance(url, str):
+                key = self.url_key(url)
+                if key is not None:
+                    pickup_keys.setdefault(key, row)
+        return pickup_keys
+
+    def resolve(self, backlink_urls: pd.Series, pickup_urls: pd.Series, pickup_keys=None):
+        """Pickup row positions by template key, and which backlink URLs fit a template at all
+
+        Returns (rows, templated): rows is -1 where no pickup shares the key.
+        A templated URL is decided by its key alone, so callers must not fall
+        back to prefix matching for it. pickup_keys from
+        index_pickups(pickup_urls) can be passed to skip re-extracting them.
+        """
+        if pickup_keys is None:
+            pickup_keys = self.index_pickups(pickup_urls)
+
+        keys = {url: self.url_key(url) for url in backlink_urls.dropna().unique()}
+        templated = backlink_urls.map(lambda url: keys.get(url) is not None if isinstance(url, str) else False)
+        rows = {url: pickup_keys.get(key, -1) for url, key in keys.items() if key is not None}
+        return backlink_urls.map(rows).fillna(-1).astype('int64'), templated.astype(bool)
+
+    def join(self, backlink_urls: pd.Series, pickup_urls: pd.Series, pickup_keys=None) -> pd.Series:
+        """Map backlink URLs to pickup row positions by template key, -1 where nothing matches"""
+        return self.resolve(backlink_urls, pickup_urls, pickup_keys)[0]
+
+
+def template_error(entry):
+    """Why a template library entry cannot be used, or None if it is valid"""
+    if not isinstance(entry, dict) or not isinstance(entry.get('template'), str):
+        return "entries need a 'template' string"
+    try:
+        re.compile(compile_template(entry['template'], 't'))
+    except re.error as e:
+        # Most often a placeholder used twice, which would be a duplicate group name
+        return f"invalid template ({str(e)})"
+    return None
+
+
+def load_template_library(path=None):
+    """Load built-in templates plus any from the project template library file"""
+    if path is None:
+        path = os.path.join(get_project_root(), TEMPLATE_LIBRARY_FILE)
+    templates = list(DEFAULT_TEMPLATES)
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                entries = json.load(f)
+            if not isinstance(entries, list):
+                raise ValueError("the template library must be a JSON list")
+            for entry in entries:
+                error = template_error(entry)
+                if error:
+                    logger.error(f"Skipping URL template {entry!r} from {path}: {error}")
+                else:
+                    templates.append(entry)
+            logger.info(f"Loaded URL templates from {path}")
+        except Exception as e:
+            logger.error(f"Error loading URL templates from {path}: {str(e)}")
+    return templates
+
+
+def get_template_matcher(path=None):
+    """Build a matcher over the full template library"""
+    return TemplateMatcher(load_template_library(path))
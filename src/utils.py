@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 
 import os
-import pandas as pd
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -13,27 +13,51 @@ COLORS = {
 }
 
 
-def create_distribution_charts(df: pd.DataFrame, figsize=None):
-    """Create a figure with distribution charts for backlink analysis"""
-    if figsize is None:
-        figsize = (12, 8)
-
-    fig = plt.figure(figsize=figsize, constrained_layout=True)
+def distribution_summary(df: pd.DataFrame) -> dict:
+    """The summary values the distribution charts are drawn from, as saved in summary.json"""
+    from main import calculate_dr_histograms
+
+    stacker_links = df[df['is_stacker_link']]
+    non_stacker_links = df[~df['is_stacker_link']]
+    summary = {
+        'Stacker Links': len(stacker_links),
+        'Non-Stacker Links': len(non_stacker_links),
+        'Average Stacker DR': stacker_links['Domain rating'].mean(),
+        'Average Non-Stacker DR': non_stacker_links['Domain rating'].mean(),
+        'Stacker Link Weight Gain': stacker_links['link_weight'].sum(),
+        'Non-Stacker Link Weight Gain': non_stacker_links['link_weight'].sum()
+    }
+    summary.update(calculate_dr_histograms(df))
+    return summary
+
+
+def create_distribution_axes(fig):
+    """Lay out the four distribution chart axes on a figure"""
     fig.patch.set_facecolor(COLORS['background'])
 
     # Create GridSpec for better layout control
     gs = fig.add_gridspec(2, 2, hspace=0.4, wspace=0.3)
-
-    # 1. Link Distribution Pie Chart
-    ax1 = fig.add_subplot(gs[0, 0])
-    ax1.set_facecolor(COLORS['background'])
-    stacker_count = len(df[df['is_stacker_link']])
-    non_stacker_count = len(df[~df['is_stacker_link']])
-
-    wedges, texts, autotexts = ax1.pie(
-        [stacker_count, non_stacker_count],
-        labels=[f'Stacker Links\n{stacker_count:,d}',
-                f'Non-Stacker Links\n{non_stacker_count:,d}'],
+    return [fig.add_subplot(gs[0, 0]), fig.add_subplot(gs[0, 1]),
+            fig.add_subplot(gs[1, 0]), fig.add_subplot(gs[1, 1])]
+
+
+def _format_dr(value):
+    """Average DR label, n/a when there were no links to average"""
+    return f'{value:.1f}' if np.isfinite(value) else 'n/a'
+
+
+def _pie(ax, values, labels, title):
+    """Stacker vs non-Stacker pie chart, NaN values drawn as empty wedges"""
+    ax.set_facecolor(COLORS['background'])
+    values = [value if np.isfinite(value) else 0 for value in values]
+    if not any(values):
+        ax.set_title(title, pad=20, weight='bold', size=12)
+        ax.text(0.5, 0.5, 'No links', ha='center', va='center', transform=ax.transAxes)
+        ax.set_axis_off()
+        return
+    wedges, texts, autotexts = ax.pie(
+        values,
+        labels=labels,
         autopct='%1.1f%%',
         colors=[COLORS['primary'], COLORS['secondary']],
         explode=(0.05, 0),  # Slightly explode Stacker slice
@@ -43,64 +67,50 @@ def create_distribution_charts(df: pd.DataFrame, figsize=None):
     )
     plt.setp(autotexts, size=9, weight='bold')
     plt.setp(texts, size=10)
-    ax1.set_title('Link Distribution', pad=20, weight='bold', size=12)
+    ax.set_title(title, pad=20, weight='bold', size=12)
 
-    # 2. Average DR Pie Chart
-    ax2 = fig.add_subplot(gs[0, 1])
-    ax2.set_facecolor(COLORS['background'])
-    stacker_dr = df[df['is_stacker_link']]['Domain rating'].mean()
-    non_stacker_dr = df[~df['is_stacker_link']]['Domain rating'].mean()
 
-    wedges, texts, autotexts = ax2.pie(
-        [stacker_dr, non_stacker_dr],
-        labels=[f'Avg Stacker DR\n{stacker_dr:.1f}',
-                f'Avg Non-Stacker DR\n{non_stacker_dr:.1f}'],
-        autopct='%1.1f%%',
-        colors=[COLORS['primary'], COLORS['secondary']],
-        explode=(0.05, 0),
-        shadow=True,
-        labeldistance=1.2,
-        pctdistance=0.85
-    )
-    plt.setp(autotexts, size=9, weight='bold')
-    plt.setp(texts, size=10)
-    ax2.set_title('DR Distribution', pad=20, weight='bold', size=12)
+def draw_distribution_charts(axes, summary: dict):
+    """Draw the distribution charts for one report summary onto four axes"""
+    from main import DR_BINS
 
-    # 3. Link Weight Distribution Pie Chart
-    ax3 = fig.add_subplot(gs[1, 0])
-    ax3.set_facecolor(COLORS['background'])
-    stacker_weight = df[df['is_stacker_link']]['link_weight'].sum()
-    non_stacker_weight = df[~df['is_stacker_link']]['link_weight'].sum()
-
-    wedges, texts, autotexts = ax3.pie(
-        [stacker_weight, non_stacker_weight],
-        labels=[f'Stacker Weight\n{stacker_weight:,.0f}',
-                f'Non-Stacker Weight\n{non_stacker_weight:,.0f}'],
-        autopct='%1.1f%%',
-        colors=[COLORS['primary'], COLORS['secondary']],
-        explode=(0.05, 0),
-        shadow=True,
-        labeldistance=1.2,
-        pctdistance=0.85
-    )
-    plt.setp(autotexts, size=9, weight='bold')
-    plt.setp(texts, size=10)
-    ax3.set_title('Link Weight Distribution', pad=20, weight='bold', size=12)
+    ax1, ax2, ax3, ax4 = axes
 
-    # 4. DR Bar Chart
-    ax4 = fig.add_subplot(gs[1, 1])
-    ax4.set_facecolor(COLORS['background'])
+    # 1. Link Distribution Pie Chart
+    stacker_count = int(summary['Stacker Links'])
+    non_stacker_count = int(summary['Non-Stacker Links'])
+    _pie(ax1, [stacker_count, non_stacker_count],
+         [f'Stacker Links\n{stacker_count:,d}', f'Non-Stacker Links\n{non_stacker_count:,d}'],
+         'Link Distribution')
 
-    # Calculate bin edges (10 bins from 0 to 100)
-    bin_edges = np.linspace(0, 100, 11)
+    # 2. Average DR Pie Chart
+    stacker_dr = summary['Average Stacker DR']
+    non_stacker_dr = summary['Average Non-Stacker DR']
+    _pie(ax2, [stacker_dr, non_stacker_dr],
+         [f'Avg Stacker DR\n{_format_dr(stacker_dr)}', f'Avg Non-Stacker DR\n{_format_dr(non_stacker_dr)}'],
+         'DR Distribution')
 
-    # Plot histograms
-    stacker_dr = df[df['is_stacker_link']]['Domain rating']
-    non_stacker_dr = df[~df['is_stacker_link']]['Domain rating']
+    # 3. Link Weight Distribution Pie Chart
+    stacker_weight = summary['Stacker Link Weight Gain']
+    non_stacker_weight = summary['Non-Stacker Link Weight Gain']
+    _pie(ax3, [stacker_weight, non_stacker_weight],
+         [f'Stacker Weight\n{stacker_weight:,.0f}', f'Non-Stacker Weight\n{non_stacker_weight:,.0f}'],
+         'Link Weight Distribution')
 
-    # Plot with step 'post' style for cleaner look
-    ax4.hist([non_stacker_dr, stacker_dr],  # Reversed order to put Stacker on top
-             bins=bin_edges,
+    # 4. DR Bar Chart
+    ax4.set_facecolor(COLORS['background'])
+    ax4.set_title('Domain Rating Distribution', pad=20, weight='bold', size=12)
+    if 'Stacker DR Histogram' not in summary:
+        # Reports saved before histograms were added to summary.json
+        ax4.text(0.5, 0.5, 'No DR histogram saved with this report', ha='center', va='center',
+                 transform=ax4.transAxes)
+        return
+
+    # Plot the saved bin counts as weights, reversed order to put Stacker on top
+    bin_centers = (DR_BINS[:-1] + DR_BINS[1:]) / 2
+    ax4.hist([bin_centers, bin_centers],
+             bins=DR_BINS,
+             weights=[summary['Non-Stacker DR Histogram'], summary['Stacker DR Histogram']],
              label=['Non-Stacker Links', 'Stacker Links'],
              color=[COLORS['secondary'], COLORS['primary']],
              alpha=0.7,
@@ -108,17 +118,15 @@ def create_distribution_charts(df: pd.DataFrame, figsize=None):
              linewidth=1,
              stacked=True)
 
-    # Add mean lines
-    stacker_mean = stacker_dr.mean()
-    non_stacker_mean = non_stacker_dr.mean()
-
-    ax4.axvline(stacker_mean, color=COLORS['primary'], linestyle='--', linewidth=2,
-                label=f'Stacker Mean: {stacker_mean:.1f}')
-    ax4.axvline(non_stacker_mean, color=COLORS['secondary'], linestyle='--', linewidth=2,
-                label=f'Non-Stacker Mean: {non_stacker_mean:.1f}')
+    # Add mean lines, skipping a side with no links
+    if np.isfinite(stacker_dr):
+        ax4.axvline(stacker_dr, color=COLORS['primary'], linestyle='--', linewidth=2,
+                    label=f'Stacker Mean: {stacker_dr:.1f}')
+    if np.isfinite(non_stacker_dr):
+        ax4.axvline(non_stacker_dr, color=COLORS['secondary'], linestyle='--', linewidth=2,
+                    label=f'Non-Stacker Mean: {non_stacker_dr:.1f}')
 
     # Styling
-    ax4.set_title('Domain Rating Distribution', pad=20, weight='bold', size=12)
     ax4.set_xlabel('Domain Rating', weight='bold')
     ax4.set_ylabel('Number of Links', weight='bold')
     ax4.grid(True, linestyle='--', alpha=0.3, color=COLORS['grid'])
@@ -126,14 +134,96 @@ def create_distribution_charts(df: pd.DataFrame, figsize=None):
     ax4.legend(frameon=True, facecolor='white', framealpha=1, loc='upper left', fontsize='small')
     ax4.set_xlim(0, 100)
 
+
+def create_distribution_charts(df: pd.DataFrame, figsize=None):
+    """Create a figure with distribution charts for backlink analysis"""
+    if figsize is None:
+        figsize = (12, 8)
+
+    fig = plt.figure(figsize=figsize, constrained_layout=True)
+    draw_distribution_charts(create_distribution_axes(fig), distribution_summary(df))
     return fig
 
 
+def create_acquisition_axes(fig):
+    """Lay out the acquisition bars and net links axes on a figure"""
+    fig.patch.set_facecolor(COLORS['background'])
+    gs = fig.add_gridspec(2, 1, height_ratios=[3, 2])
+    ax1 = fig.add_subplot(gs[0])
+    return [ax1, fig.add_subplot(gs[1], sharex=ax1)]
+
+
+def draw_acquisition_chart(axes, curves: dict, title='Link Acquisition'):
+    """Draw per-period acquisition and loss bars and net link growth onto two axes"""
+    ax1, ax2 = axes
+    periods = curves['periods']
+    x = np.arange(len(periods))
+    stacker_acquired = np.array(curves['stacker_acquired'])
+    non_stacker_acquired = np.array(curves['non_stacker_acquired'])
+    stacker_lost = np.array(curves['stacker_lost'])
+    non_stacker_lost = np.array(curves['non_stacker_lost'])
+
+    # 1. Links acquired (above the axis) and lost (below) per period
+    ax1.set_facecolor(COLORS['background'])
+    ax1.bar(x, stacker_acquired, color=COLORS['primary'], label='Stacker Acquired')
+    ax1.bar(x, non_stacker_acquired, bottom=stacker_acquired, color=COLORS['secondary'],
+            label='Non-Stacker Acquired')
+    ax1.bar(x, -stacker_lost, color=COLORS['primary'], alpha=0.5, hatch='//', label='Stacker Lost')
+    ax1.bar(x, -non_stacker_lost, bottom=-stacker_lost, color=COLORS['secondary'], alpha=0.5,
+            hatch='//', label='Non-Stacker Lost')
+    ax1.axhline(0, color=COLORS['primary'], linewidth=1)
+    ax1.set_title(title, pad=20, weight='bold', size=12)
+    ax1.set_ylabel('Links Acquired / Lost', weight='bold')
+    ax1.grid(True, axis='y', linestyle='--', alpha=0.3, color=COLORS['grid'])
+    ax1.legend(frameon=True, facecolor='white', framealpha=1, loc='upper left', fontsize='small')
+
+    # 2. Cumulative net links for each group
+    ax2.set_facecolor(COLORS['background'])
+    ax2.plot(x, np.cumsum(stacker_acquired - stacker_lost), color=COLORS['primary'], linewidth=2,
+             label='Stacker Links')
+    ax2.plot(x, np.cumsum(non_stacker_acquired - non_stacker_lost), color=COLORS['secondary'],
+             linewidth=2, linestyle='--', label='Non-Stacker Links')
+    ax2.set_title('Net Live Links', pad=10, weight='bold', size=12)
+    ax2.set_ylabel('Number of Links', weight='bold')
+    ax2.grid(True, linestyle='--', alpha=0.3, color=COLORS['grid'])
+    ax2.legend(frameon=True, facecolor='white', framealpha=1, loc='upper left', fontsize='small')
+
+    # Label at most about 12 periods so weekly axes stay readable
+    step = max(1, len(periods) // 12)
+    ax2.set_xticks(x[::step])
+    ax2.set_xticklabels(periods[::step], rotation=45, ha='right')
+    plt.setp(ax1.get_xticklabels(), visible=False)
+
+
+def create_acquisition_chart(curves: dict, title='Link Acquisition', figsize=None):
+    """Create a figure with per-period acquisition and loss bars and net link growth"""
+    if figsize is None:
+        figsize = (12, 8)
+
+    fig = plt.figure(figsize=figsize, constrained_layout=True)
+    draw_acquisition_chart(create_acquisition_axes(fig), curves, title)
+    return fig
+
+
+def draw_rollup_chart(ax, totals: pd.DataFrame, label_column, title, top=15):
+    """Horizontal bars of link weight for the top rows of a rollup"""
+    ax.set_facecolor(COLORS['background'])
+    ax.set_title(title, pad=20, weight='bold', size=12)
+    totals = totals.head(top).iloc[::-1]  # Largest bar on top
+    labels = [str(label)[:40] for label in totals[label_column]]
+    ax.barh(np.arange(len(totals)), totals['Link Weight'], color=COLORS['primary'])
+    ax.set_yticks(np.arange(len(totals)))
+    ax.set_yticklabels(labels, size=8)
+    ax.set_xlabel('Link Weight', weight='bold')
+    ax.grid(True, axis='x', linestyle='--', alpha=0.3, color=COLORS['grid'])
+
+
 def get_chart_styles():
     """Return consistent chart styling options"""
     return {
         'colors': COLORS,
         'figsize': {
-            'distribution': (12, 8)
+            'distribution': (12, 8),
+            'acquisition': (12, 8)
         }
     }
\ No newline at end of file
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import logging
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from file_handler import file_signature, find_ahrefs_file, find_pickup_file
+from pipeline import analyze_client
+from utils import get_client_directory
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEBOUNCE = 10.0  # Seconds a client's files must stay unchanged before analysis
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+
+def client_signature(client_path):
+    """Signature of a client's input exports, None while either is missing"""
+    try:
+        ahrefs_file = find_ahrefs_file(client_path)
+        pickup_file = find_pickup_file(client_path)
+    except OSError:
+        return None
+    if not ahrefs_file or not pickup_file:
+        return None
+    return file_signature(ahrefs_file), file_signature(pickup_file)
+
+
+def run_analysis_job(client, client_dir):
+    """Worker entry point, returning only the report path to keep results small"""
+    _, report_path = analyze_client(client, client_dir)
+    return report_path
+
+
+class JobQueue:
+    """Deduplicating job queue drained by a bounded process pool
+
+    A client is queued at most once. If it changes again while its job is
+    running, one more run is scheduled after the current one finishes.
+    """
+
+    def __init__(self, client_dir, max_workers=DEFAULT_WORKERS):
+        self.client_dir = client_dir
+        self.max_workers = max_workers
+        self.executor = ProcessPoolExecutor(max_workers=max_workers)
+        self.waiting = OrderedDict()
+        self.running = set()
+        self.rerun = set()
+        self.lock = threading.RLock()
+
+    def put(self, client):
+        with self.lock:
+            if client in self.running:
+                self.rerun.add(client)
+            elif client not in self.waiting:
+                self.waiting[client] = None
+                logger.info(f"Queued {client} ({len(self.waiting)} waiting)")
+            self._fill()
+
+    def _fill(self):
+        while self.waiting and len(self.running) < self.max_workers:
+            client, _ = self.waiting.popitem(last=False)
+            self.running.add(client)
+            future = self.executor.submit(run_analysis_job, client, self.client_dir)
+            future.add_done_callback(lambda f, client=client: self._done(client, f))
+
+    def _done(self, client, future):
+        try:
+            logger.info(f"Finished {client}: {future.result()}")
+        except Exception as e:
+            logger.error(f"Error analyzing {client}: {str(e)}")
+        with self.lock:
+            self.running.discard(client)
+            if client in self.rerun:
+                self.rerun.discard(client)
+                self.waiting[client] = None
+            self._fill()
+
+    def idle(self):
+        with self.lock:
+            return not self.waiting and not self.running
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+class ClientWatcher:
+    """Watch clients/*/ and analyze a client once its exports settle after a change"""
+
+    def __init__(self, client_dir=None, debounce=DEFAULT_DEBOUNCE,
+                 poll_interval=DEFAULT_POLL_INTERVAL, max_workers=DEFAULT_WORKERS,
+                 use_inotify=True):
+        self.client_dir = client_dir or get_client_directory()
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.queue = JobQueue(self.client_dir, max_workers)
+        self.signatures = {}
+        self.changed_at = {}
+        self.stopped = threading.Event()
+
+        self.inotify = None
+        self.watches = {}
+        if use_inotify and INotify is not None:
+            self.inotify = INotify()
+            self.watch_mask = (flags.CREATE | flags.CLOSE_WRITE | flags.MOVED_TO |
+                               flags.MOVED_FROM | flags.DELETE | flags.MODIFY)
+            self.root_watch = self.inotify.add_watch(self.client_dir, flags.CREATE | flags.MOVED_TO)
+        logger.info(f"Watching {self.client_dir} using {'inotify' if self.inotify else 'stat polling'}")
+
+    def list_clients(self):
+        return [d for d in os.listdir(self.client_dir)
+                if os.path.isdir(os.path.join(self.client_dir, d)) and not d.startswith('.')]
+
+    def _watch_client(self, client):
+        if self.inotify is not None and client not in self.watches.values():
+            try:
+                wd = self.inotify.add_watch(os.path.join(self.client_dir, client), self.watch_mask)
+                self.watches[wd] = client
+            except OSError as e:
+                logger.error(f"Error watching {client}: {str(e)}")
+
+    def _changed_clients(self):
+        """Clients that may have changed since the last tick"""
+        if self.inotify is None:
+            time.sleep(self.poll_interval)
+            return set(self.list_clients())
+
+        changed = set()
+        for event in self.inotify.read(timeout=int(self.poll_interval * 1000)):
+            if event.wd == self.root_watch:
+                if event.name and os.path.isdir(os.path.join(self.client_dir, event.name)):
+                    self._watch_client(event.name)
+                    changed.add(event.name)
+            elif event.wd in self.watches:
+                changed.add(self.watches[event.wd])
+        return changed
+
+    def scan(self, initial=False):
+        """Record current signatures, queueing every ready client if initial"""
+        for client in self.list_clients():
+            self._watch_client(client)
+            signature = client_signature(os.path.join(self.client_dir, client))
+            self.signatures[client] = signature
+            if initial and signature is not None:
+                self.queue.put(client)
+
+    def tick(self):
+        """Check for changes and queue clients whose debounce window has passed"""
+        now = time.monotonic()
+        for client in self._changed_clients() | set(self.changed_at):
+            signature = client_signature(os.path.join(self.client_dir, client))
+            if signature != self.signatures.get(client):
+                # Any change restarts the window, so half-copied files are never picked up
+                self.signatures[client] = signature
+                self.changed_at[client] = now
+
+        for client, changed_at in list(self.changed_at.items()):
+            if now - changed_at >= self.debounce:
+                del self.changed_at[client]
+                if self.signatures.get(client) is not None:
+                    self.queue.put(client)
+
+    def run(self, initial_scan=False):
+        self.scan(initial=initial_scan)
+        try:
+            while not self.stopped.is_set():
+                self.tick()
+        finally:
+            self.queue.shutdown()
+            if self.inotify is not None:
+                self.inotify.close()
+
+    def stop(self):
+        self.stopped.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-analyze clients when their exports change")
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                        help="Seconds files must stay unchanged before analysis")
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--poll', action='store_true', help="Use stat polling even if inotify is available")
+    parser.add_argument('--initial-scan', action='store_true', help="Analyze every client on startup")
+    args = parser.parse_args()
+
+    watcher = ClientWatcher(
+        debounce=args.debounce,
+        poll_interval=args.poll_interval,
+        max_workers=args.workers,
+        use_inotify=not args.poll
+    )
+    try:
+        watcher.run(initial_scan=args.initial_scan)
+    except KeyboardInterrupt:
+        logger.info("Stopping watcher")
+
+
+if __name__ == "__main__":
+    main()
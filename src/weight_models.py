@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+from file_handler import find_ahrefs_file, get_latest_report_dir, read_csv
+from utils import get_project_root, get_client_directory
+
+logger = logging.getLogger(__name__)
+
+WEIGHT_MODEL_FILE = 'weight_models.json'
+WEIGHT_INPUTS_DIR = '.weight_inputs'  # Per client, one cached npz of model inputs per report
+DEFAULT_MODEL = 'dr_squared'
+CHUNK_ROWS = 250000  # Rows per block of the weight matrix, bounds its memory
+
+# Model inputs and the Ahrefs columns they come from
+FEATURES = {
+    'dr': 'Domain rating',
+    'traffic': 'Domain traffic',
+    'ur': 'UR'
+}
+
+# Built-in models, extended or overridden by weight_models.json in the project root
+DEFAULT_MODELS = {
+    # scale * DR ** exponent
+    'dr_squared': {'type': 'power', 'exponent': 2, 'scale': 10},
+    'linear': {'type': 'power', 'exponent': 1, 'scale': 1},
+    # scale * base ** (DR / step)
+    'exponential': {'type': 'exponential', 'base': 2, 'step': 10, 'scale': 1},
+    # Fixed weight for each DR bucket starting at the matching edge
+    'dr_buckets': {'type': 'buckets', 'edges': [0, 30, 50, 70, 90], 'weights': [1, 5, 20, 50, 100]},
+    # scale * DR ** exponent * transform(feature)
+    'traffic_weighted': {'type': 'traffic', 'feature': 'traffic', 'transform': 'log1p', 'exponent': 2, 'scale': 1},
+    'ur_weighted': {'type': 'traffic', 'feature': 'ur', 'transform': 'linear', 'exponent': 2, 'scale': 0.1},
+}
+
+TRANSFORMS = {
+    'linear': lambda values: values,
+    'log1p': np.log1p,
+    'sqrt': np.sqrt
+}
+
+
+def _params(specs, name):
+    return np.asarray([spec[name] for spec in specs])
+
+
+def _power(features, specs):
+    return _params(specs, 'scale') * features['dr'][:, None] ** _params(specs, 'exponent')
+
+
+def _exponential(features, specs):
+    return _params(specs, 'scale') * _params(specs, 'base') ** (features['dr'][:, None] / _params(specs, 'step'))
+
+
+def _buckets(features, specs):
+    dr = features['dr']
+    columns = []
+    for spec in specs:
+        weights = np.asarray(spec['weights'], dtype=float)
+        bucket = np.clip(np.searchsorted(spec['edges'], dr, side='right') - 1, 0, len(weights) - 1)
+        columns.append(np.where(np.isnan(dr), np.nan, weights[bucket]))
+    return np.column_stack(columns)
+
+
+def _traffic(features, specs):
+    dr = features['dr']
+    columns = []
+    for spec in specs:
+        feature = TRANSFORMS[spec.get('transform', 'linear')](features[spec['feature']])
+        columns.append(spec['scale'] * dr ** spec['exponent'] * feature)
+    return np.column_stack(columns)
+
+
+# Each type evaluates all of its models at once into an (n links x k models) block
+MODEL_TYPES = {
+    'power': _power,
+    'exponential': _exponential,
+    'buckets': _buckets,
+    'traffic': _traffic
+}
+
+
+def required_features(spec):
+    return {'dr', spec['feature']} if spec['type'] == 'traffic' else {'dr'}
+
+
+def frame_features(df: pd.DataFrame) -> dict:
+    """Model inputs available in a DataFrame of backlinks"""
+    return {name: df[column].to_numpy() for name, column in FEATURES.items() if column in df.columns}
+
+
+def model_weights(features: dict, spec=None) -> np.ndarray:
+    """Weights of one model, keeping integer weights for integer inputs and parameters"""
+    spec = spec or DEFAULT_MODELS[DEFAULT_MODEL]
+    return MODEL_TYPES[spec['type']](features, [spec])[:, 0]
+
+
+class WeightModels:
+    """A set of link weight models evaluated together as one weight matrix
+
+    Models of the same type are evaluated with one broadcast over the
+    feature vectors. Stacker and non-Stacker totals for every model then
+    come from a single (2 x n) @ (n x models) product.
+    """
+
+    def __init__(self, models):
+        self.models = dict(models)
+        self.names = list(self.models)
+        self.groups = {}
+        for position, (name, spec) in enumerate(self.models.items()):
+            if spec['type'] not in MODEL_TYPES:
+                raise ValueError(f"Unknown weight model type for {name}: {spec['type']}")
+            self.groups.setdefault(spec['type'], []).append(position)
+
+    def matrix(self, features: dict) -> np.ndarray:
+        """(n links x models) weights, NaN for models whose features are missing"""
+        rows = len(features['dr'])
+        weights = np.full((rows, len(self.names)), np.nan)
+        for model_type, positions in self.groups.items():
+            positions = [p for p in positions if required_features(self.models[self.names[p]]) <= set(features)]
+            if positions:
+                specs = [self.models[self.names[p]] for p in positions]
+                weights[:, positions] = MODEL_TYPES[model_type](features, specs)
+        return weights
+
+    def totals(self, features: dict, is_stacker) -> pd.DataFrame:
+        """Stacker and non-Stacker weight totals for every model"""
+        features = {name: np.asarray(values, dtype=float) for name, values in features.items()}
+        is_stacker = np.asarray(is_stacker, dtype=bool)
+        sums = np.zeros((2, len(self.names)))
+        for start in range(0, len(is_stacker), CHUNK_ROWS):
+            block = {name: values[start:start + CHUNK_ROWS] for name, values in features.items()}
+            stacker = is_stacker[start:start + CHUNK_ROWS]
+            groups = np.stack([stacker, ~stacker]).astype(float)
+            sums += groups @ np.nan_to_num(self.matrix(block))
+
+        totals = pd.DataFrame({
+            'Stacker Weight': sums[0],
+            'Non-Stacker Weight': sums[1]
+        }, index=pd.Index(self.names, name='Model'))
+        missing = [name for name in self.names if not required_features(self.models[name]) <= set(features)]
+        totals.loc[missing] = np.nan
+        totals['Stacker Weight Share'] = totals['Stacker Weight'] / (totals['Stacker Weight'] + totals['Non-Stacker Weight'])
+        return totals
+
+
+def model_error(spec):
+    """Why a weight model spec cannot be used, or None if it is valid"""
+    if not isinstance(spec, dict) or spec.get('type') not in MODEL_TYPES:
+        return f"models need a 'type' of {', '.join(MODEL_TYPES)}"
+    if spec['type'] == 'traffic':
+        if spec.get('feature') not in FEATURES:
+            return f"traffic models need a 'feature' of {', '.join(FEATURES)}"
+        if spec.get('transform', 'linear') not in TRANSFORMS:
+            return f"unknown transform {spec['transform']!r}"
+    if spec['type'] == 'buckets':
+        if not isinstance(spec.get('edges'), list) or not isinstance(spec.get('weights'), list) \
+                or len(spec['edges']) != len(spec['weights']) or not spec['edges']:
+            return "bucket models need 'edges' and 'weights' lists of the same length"
+        if not all(np.issubdtype(np.asarray(spec[key]).dtype, np.number) for key in ('edges', 'weights')):
+            return "bucket edges and weights must be numbers"
+    # Evaluate on a few sample links, which catches missing and non-numeric parameters
+    sample = {name: np.array([0.0, 50.0, 100.0]) for name in FEATURES}
+    try:
+        weights = MODEL_TYPES[spec['type']](sample, [spec])
+        if weights.shape != (3, 1) or not np.issubdtype(weights.dtype, np.number):
+            return "parameters must be single numbers"
+    except Exception as e:
+        return f"invalid parameters ({type(e).__name__}: {str(e)})"
+    return None
+
+
+def load_model_library(path=None):
+    """Load built-in models plus any from the project weight model file"""
+    if path is None:
+        path = os.path.join(get_project_root(), WEIGHT_MODEL_FILE)
+    models = dict(DEFAULT_MODELS)
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                entries = json.load(f)
+            if not isinstance(entries, dict):
+                raise ValueError("the weight model library must be a JSON object keyed by model name")
+            for name, spec in entries.items():
+                error = model_error(spec)
+                if error:
+                    logger.error(f"Skipping weight model {name!r} from {path}: {error}")
+                else:
+                    models[name] = spec
+            logger.info(f"Loaded weight models from {path}")
+        except Exception as e:
+            logger.error(f"Error loading weight models from {path}: {str(e)}")
+    return models
+
+
+def get_weight_models(names=None, path=None):
+    """Build an evaluator over the model library, or the named models from it"""
+    models = load_model_library(path)
+    if names:
+        models = {name: models[name] for name in names}
+    return WeightModels(models)
+
+
+def load_report_features(report_path):
+    """Feature vectors and Stacker flags for a report, cached per client
+
+    DR and the Stacker flag come from backlinks_analysis.csv, and traffic and
+    UR from the copy of the Ahrefs export saved with the report, when its
+    Referring page URLs line up row for row with the results. Published
+    reports are never written to, so the cache is kept in the client's
+    .weight_inputs directory, keyed by report name.
+    """
+    report_path = os.path.normpath(report_path)
+    client_path = os.path.dirname(os.path.dirname(report_path))
+    cache_dir = os.path.join(client_path, WEIGHT_INPUTS_DIR)
+    cache_path = os.path.join(cache_dir, f"{os.path.basename(report_path)}.npz")
+    if os.path.exists(cache_path):
+        try:
+            with np.load(cache_path) as cached:
+                arrays = dict(cached)
+            is_stacker = arrays.pop('is_stacker')
+            return arrays, is_stacker
+        except Exception as e:
+            logger.warning(f"Rebuilding unreadable weight inputs cache {cache_path}: {str(e)}")
+
+    matched = read_csv(os.path.join(report_path, 'backlinks_analysis.csv'),
+                       usecols=['Referring page URL', 'Domain rating', 'is_stacker_link'])
+    features = {'dr': matched['Domain rating'].to_numpy(dtype=float)}
+    ahrefs_file = find_ahrefs_file(report_path)
+    if ahrefs_file:
+        extra = read_csv(ahrefs_file, usecols=['Referring page URL', FEATURES['traffic'], FEATURES['ur']])
+        if rows_line_up(extra['Referring page URL'], matched['Referring page URL']):
+            features.update({name: values.astype(float) for name, values in frame_features(extra).items()})
+        else:
+            logger.warning(f"Ahrefs export in {report_path} does not line up with its results, "
+                           "traffic models are unavailable")
+
+    is_stacker = matched['is_stacker_link'].to_numpy(dtype=bool)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, is_stacker=is_stacker, **features)
+    os.replace(tmp_path, cache_path)
+    return features, is_stacker
+
+
+def rows_line_up(urls_a: pd.Series, urls_b: pd.Series) -> bool:
+    """Whether two Referring page URL columns hold the same URLs in the same order"""
+    if len(urls_a) != len(urls_b):
+        return False
+    return bool((urls_a.fillna('').astype(str).to_numpy() == urls_b.fillna('').astype(str).to_numpy()).all())
+
+
+def compare_models(clients=None, models=None, client_dir=None):
+    """Stacker and non-Stacker totals for every model and every client's latest report"""
+    client_dir = client_dir or get_client_directory()
+    models = models or get_weight_models()
+    if clients is None:
+        clients = sorted(d for d in os.listdir(client_dir)
+                         if os.path.isdir(os.path.join(client_dir, d)) and not d.startswith('.'))
+
+    tables = []
+    for client in clients:
+        report_path = get_latest_report_dir(os.path.join(client_dir, client))
+        if report_path is None:
+            continue
+        try:
+            features, is_stacker = load_report_features(report_path)
+        except Exception as e:
+            logger.error(f"Error loading weight inputs for {client}: {str(e)}")
+            continue
+        totals = models.totals(features, is_stacker).reset_index()
+        totals.insert(0, 'Client', client)
+        tables.append(totals)
+
+    columns = ['Client', 'Model', 'Stacker Weight', 'Non-Stacker Weight', 'Stacker Weight Share']
+    return pd.concat(tables, ignore_index=True) if tables else pd.DataFrame(columns=columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare link weight models across clients")
+    parser.add_argument('clients', nargs='*', help="Client names (defaults to every client)")
+    parser.add_argument('--models', nargs='+', help="Models to compare (defaults to the whole library)")
+    parser.add_argument('--list', action='store_true', help="List the model library and exit")
+    parser.add_argument('--output', help="Optional CSV path for the comparison table")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, spec in load_model_library().items():
+            print(f"{name}: {json.dumps(spec)}")
+        return
+
+    table = compare_models(args.clients or None, get_weight_models(args.models))
+    print(table.to_string(index=False))
+    if args.output:
+        table.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import os
+import sys
+import logging
+
+# Modules in src/ import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+logging.disable(logging.INFO)
@@ -0,0 +1,43 @@
+import os
+import pandas as pd
+import pytest
+from batch_render import render_clients
+from pipeline import analyze_client
+
+CLIENT = 'nomatch'
+
+
+@pytest.fixture
+def client_dir(tmp_path):
+    """One client whose backlinks match none of its pickups"""
+    client_path = tmp_path / CLIENT
+    client_path.mkdir()
+    pd.DataFrame({
+        'Referring page URL': ['https://example.com/blog/post', 'https://other.org/news/item'],
+        'Domain rating': [45, 60],
+        'Target URL': ['https://client.com/', 'https://client.com/about'],
+        'First seen': ['2025-01-05', '2025-02-10'],
+        'Lost': ['', '']
+    }).to_csv(client_path / 'client.com-backlinks-subdomains_2025-03-01_10-00-00.csv', index=False)
+    pd.DataFrame({
+        'Story ID': [1],
+        'Story Name': ['Retirement tips'],
+        'Publisher': ['The Paperboy News'],
+        'Partner': ['Creative Circle Media Solutions'],
+        'Domain': ['//thepaperboy.news'],
+        'URL': ['https://www.thepaperboy.news/premium/stacker/stories/retirement-tips,118000']
+    }).to_csv(client_path / 'custom_pickup_export_1.csv', index=False)
+    analyze_client(CLIENT, str(tmp_path))
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize('fmt', ['pdf', 'png'])
+def test_render_client_without_stacker_links(client_dir, tmp_path, fmt):
+    output_dir = str(tmp_path / 'rendered')
+    outputs = render_clients([CLIENT], output_dir, fmt, workers=1, client_dir=client_dir)
+
+    assert CLIENT in outputs
+    if fmt == 'pdf':
+        assert os.path.getsize(outputs[CLIENT]) > 0
+    else:
+        assert '01_distribution.png' in os.listdir(outputs[CLIENT])
@@ -0,0 +1,36 @@
+import asyncio
+from aiohttp import web
+from link_verifier import LinkVerifier, ResponseCache
+
+
+async def verify_after_redirect():
+    async def old(request):
+        raise web.HTTPFound('/new/page')
+
+    async def new(request):
+        return web.Response(text='<a href="target">Client</a>', content_type='text/html')
+
+    app = web.Application()
+    app.router.add_get('/old/page', old)
+    app.router.add_get('/new/page', new)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    try:
+        host, port = runner.addresses[0][:2]
+        base = f'http://{host}:{port}'
+        verifier = LinkVerifier(retries=0, timeout=5, cache=ResponseCache())
+        entries = await verifier.verify_async([
+            (f'{base}/old/page', f'{base}/new/target'),
+            (f'{base}/old/page', f'{base}/old/target')
+        ])
+        return entries[f'{base}/old/page']['targets'], base
+    finally:
+        await runner.cleanup()
+
+
+def test_relative_links_resolve_against_redirected_page():
+    targets, base = asyncio.run(verify_after_redirect())
+
+    assert targets == {f'{base}/new/target': True, f'{base}/old/target': False}
@@ -0,0 +1,33 @@
+import partner_index
+from partner_index import get_partner_domains
+
+PICKUPS = (
+    'Publisher,Partner,Domain,URL\n'
+    'The Paperboy News,Creative Circle,//thepaperboy.news,'
+    'https://www.thepaperboy.news/premium/stacker/stories/retirement-tips\n'
+)
+
+
+def write_pickups(client_dir, client):
+    client_path = client_dir / client
+    client_path.mkdir()
+    (client_path / 'custom_pickup_export_1.csv').write_text(PICKUPS)
+
+
+def test_indexed_client_domains(tmp_path):
+    write_pickups(tmp_path, 'client')
+
+    assert get_partner_domains('client', str(tmp_path)) == {'thepaperboy.news'}
+
+
+def test_unindexed_client_is_not_filtered(tmp_path, monkeypatch):
+    write_pickups(tmp_path, 'indexed')
+    get_partner_domains('indexed', str(tmp_path))
+    write_pickups(tmp_path, 'client')
+
+    def unreadable(path, usecols=None):
+        raise OSError(f"Permission denied: {path}")
+
+    monkeypatch.setattr(partner_index, 'read_csv', unreadable)
+    # Filtering by the other clients' domains alone would drop this client's matches
+    assert get_partner_domains('client', str(tmp_path)) is None
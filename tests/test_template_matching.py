@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+from main import PickupIndex, match_urls
+from client_store import ClientStore
+from url_templates import TemplateMatcher, DEFAULT_TEMPLATES
+
+DOMAIN = 'thepaperboy.news'
+
+
+@pytest.fixture
+def exports(tmp_path):
+    """Two stories on one partner domain whose paths share their first 10 characters"""
+    pickup_df = pd.DataFrame({
+        'URL': [
+            f'https://{DOMAIN}/premium/stacker/stories/retirement-tips,118000',
+            f'https://{DOMAIN}/premium/stacker/stories/health-benefits,119445',
+            f'https://{DOMAIN}/news/local-election',
+        ],
+        'Story Name': ['Retirement tips', 'Health benefits', 'Local election'],
+        'Story ID': [1, 2, 3],
+        'Partner': ['Creative Circle Media Solutions'] * 3,
+        'Publisher': ['Paperboy'] * 3,
+    })
+    ahrefs_df = pd.DataFrame({
+        'Referring page URL': [
+            f'https://{DOMAIN}/premium/stacker/stories/health-benefits,119445',
+            f'https://www.{DOMAIN}/premium/stacker/stories/retirement-tips-2,118000',
+            f'https://{DOMAIN}/premium/stacker/stories/unrelated-story,999999',
+            f'https://{DOMAIN}/news/local-election?ref=home',
+        ],
+        'Domain rating': [70, 60, 50, 40],
+        'Target URL': 'https://client.com/study',
+    })
+    pickup_path = tmp_path / 'custom_pickup_export_1.csv'
+    ahrefs_path = tmp_path / 'client Ahrefs.csv'
+    pickup_df.to_csv(pickup_path, index=False)
+    ahrefs_df.to_csv(ahrefs_path, index=False)
+    return tmp_path, pd.read_csv(ahrefs_path), pd.read_csv(pickup_path)
+
+
+EXPECTED_STORIES = ['Health benefits', 'Retirement tips', '', 'Local election']
+EXPECTED_VIA = ['url template', 'url template', '', 'referring page']
+
+
+def test_match_urls_resolves_template_urls_by_id(exports):
+    _, ahrefs_df, pickup_df = exports
+    matched = match_urls(ahrefs_df, pickup_df, TemplateMatcher(DEFAULT_TEMPLATES),
+                         pickup_index=PickupIndex(pickup_df), partner_domains={DOMAIN})
+
+    assert matched['matched_story'].fillna('').tolist() == EXPECTED_STORIES
+    assert matched['matched_via'].tolist() == EXPECTED_VIA
+    assert matched['is_stacker_link'].tolist() == [True, True, False, True]
+
+
+def test_client_store_resolves_template_urls_by_id(exports):
+    tmp_path, _, _ = exports
+    with ClientStore(str(tmp_path / 'store.sqlite')) as store:
+        store.load(str(tmp_path / 'client Ahrefs.csv'), str(tmp_path / 'custom_pickup_export_1.csv'))
+        store.match(TemplateMatcher(DEFAULT_TEMPLATES), {DOMAIN})
+        matched = pd.concat(store.iter_matched(), ignore_index=True)
+
+    assert matched['matched_story'].fillna('').tolist() == EXPECTED_STORIES
+    assert matched['matched_via'].tolist() == EXPECTED_VIA
+    assert matched['is_stacker_link'].tolist() == [True, True, False, True]
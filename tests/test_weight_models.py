@@ -0,0 +1,21 @@
+import json
+import numpy as np
+from weight_models import DEFAULT_MODELS, load_model_library, WeightModels
+
+
+def test_malformed_model_is_skipped(tmp_path):
+    path = tmp_path / 'weight_models.json'
+    path.write_text(json.dumps({
+        'dr_cubed': {'type': 'power', 'exponent': 3, 'scale': 1},
+        'broken': {'type': 'power', 'exponent': 3}
+    }))
+
+    models = load_model_library(str(path))
+
+    assert 'broken' not in models
+    assert models['dr_cubed'] == {'type': 'power', 'exponent': 3, 'scale': 1}
+    assert set(DEFAULT_MODELS) < set(models)
+
+    totals = WeightModels(models).totals({'dr': np.array([10.0, 20.0])}, [True, False])
+    assert totals.loc['dr_cubed', 'Stacker Weight'] == 1000
+    assert totals.loc['dr_cubed', 'Non-Stacker Weight'] == 8000